@@ -6,7 +6,7 @@ from glob import glob
 import pandas as pd
 import streamlit as st
 from live_score import LiveScoreService
-from match_predictor import FootballMatchPredictor
+from match_predictor import FootballMatchPredictor, DEFAULT_MODEL_PATH
 
 
 class FootballXApp:
@@ -643,6 +643,12 @@ class FootballXApp:
         """Get future matches from all available data"""
         return pd.DataFrame()
 
+    @st.cache_resource(max_entries=1)
+    def _get_predictor(_self, winrate_files, fingerprint):
+        # fingerprint face parte din cheia de cache: date noi -> predictor nou
+        predictor = FootballMatchPredictor(list(winrate_files))
+        return predictor.update_or_train(DEFAULT_MODEL_PATH, n_jobs=-1)
+
     def display_prediction_section(self, winrate_files):
         """Display prediction section with combined datasets"""
         with st.expander("Predict Future Match", expanded=True):
@@ -671,8 +677,9 @@ class FootballXApp:
 
                 with st.spinner("Predicting..."):
                     try:
-                        predictor = FootballMatchPredictor(winrate_files)
-                        predictor.train_models()
+                        predictor = self._get_predictor(
+                            tuple(sorted(winrate_files)),
+                            FootballMatchPredictor.data_fingerprint(winrate_files))
 
                         predictions = predictor.predict_future_match(home_team, away_team)
 
@@ -0,0 +1,357 @@
+import contextlib
+import io
+import os
+import pickle
+import sys
+import tempfile
+import time
+import tracemalloc
+from glob import glob
+
+import numpy as np
+import pandas as pd
+
+from concatenate_data import StandingsProcessor
+from match_predictor import ENGINES, FootballMatchPredictor, _fit_and_score
+from match_preprocessor import MatchPreprocessor
+
+
+def _timed(func, repeat=3):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def _peak_memory(func):
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _flatten_to_long_scan(processor):
+    """Varianta veche: scanează toată lista de meciuri pentru fiecare echipă din clasament."""
+    standings_data = processor.load_json(processor.standings_file)["standings"]
+    matches_data = processor.load_json(processor.matches_file)
+
+    if isinstance(matches_data, dict) and "matches" in matches_data:
+        matches_data = matches_data["matches"]
+
+    team_rank_map = {team["team"]: team["rank"] for team in standings_data}
+    flattened_rows = []
+
+    for team in standings_data:
+        team_name = team["team"]
+        team_matches = [m for m in matches_data if m.get("home") == team_name or m.get("away") == team_name]
+        team_matches.sort(key=lambda x: (x.get("date", ""), x.get("time", "")))
+
+        for match in team_matches:
+            is_home = match.get("home") == team_name
+            opponent = match.get("away") if is_home else match.get("home")
+
+            try:
+                goals_for = int(match.get("home_goals") if is_home else match.get("away_goals"))
+                goals_against = int(match.get("away_goals") if is_home else match.get("home_goals"))
+            except:
+                goals_for = goals_against = 0
+
+            row = {
+                "Rank": team["rank"],
+                "Team": team_name,
+                "Wins": team["W"],
+                "Draws": team["D"],
+                "Loses": team["L"],
+                "Team_goals": team["GF"],
+                "Opponents_goals": team["GA"],
+                "Goal_difference": team["GD"],
+                "Points": team["Pts"],
+                "Opponent": opponent,
+                "opponent_rank": team_rank_map.get(opponent, ""),
+                "Date": match.get("date", ""),
+                "Time": match.get("time", ""),
+                "Home/Away": "home" if is_home else "away",
+                "team_goals": goals_for,
+                "opponent_goals": goals_against,
+                "Outcome": processor.outcome(goals_for, goals_against),
+                "Target_Winner": (
+                    "team" if goals_for > goals_against else
+                    "opponent" if goals_for < goals_against else
+                    "draw"
+                )
+            }
+
+            for stat in match.get("statistics", []):
+                stat_name = processor.normalize_stat_name(stat["label"])
+                stat_home, stat_away = stat["home_value"], stat["away_value"]
+
+                if is_home:
+                    row[f"stat_{stat_name}_team"] = stat_home
+                    row[f"stat_{stat_name}_opponent"] = stat_away
+                else:
+                    row[f"stat_{stat_name}_team"] = stat_away
+                    row[f"stat_{stat_name}_opponent"] = stat_home
+
+            flattened_rows.append(row)
+
+    processor.df = pd.DataFrame(flattened_rows)
+    return processor
+
+
+def bench_flatten(leagues=("champions-league-2024-2025", "bundesliga-2024-2025", "france-ligue-1-2024-2025",
+                           "jupiler-pro-league-2024-2025", "liga-portugal-2024-2025",
+                           "romania-superliga-2024-2025")):
+    # fișierele JSON se încarcă o singură dată, ca să măsurăm doar construcția rândurilor
+    for league in leagues:
+        processor = StandingsProcessor(f"processed/standings-{league}.json",
+                                       f"processed/all-matches-{league}.json")
+        cache = {path: processor.load_json(path) for path in (processor.standings_file, processor.matches_file)}
+        processor.load_json = cache.__getitem__
+
+        t_scan, old = _timed(lambda: _flatten_to_long_scan(processor).df)
+        t_index, new = _timed(lambda: processor.flatten_to_long().df)
+        pd.testing.assert_frame_equal(old, new)
+        print(f"{league}: {len(new)} rânduri | scan {t_scan * 1000:.1f} ms | "
+              f"index {t_index * 1000:.1f} ms | x{t_scan / t_index:.1f}")
+
+
+def bench_clean_eda(leagues=("champions-league-2024-2025", "bundesliga-2024-2025", "france-ligue-1-2024-2025",
+                             "jupiler-pro-league-2024-2025", "liga-portugal-2024-2025",
+                             "romania-superliga-2024-2025")):
+    # toate ligile concatenate, ca tabelul să aibă lățimea și înălțimea reală
+    frames = [StandingsProcessor(f"processed/standings-{league}.json",
+                                 f"processed/all-matches-{league}.json").flatten_to_long().df
+              for league in leagues]
+    raw = pd.concat(frames, ignore_index=True)
+    processor = StandingsProcessor(None, None)
+
+    def run(use_schema):
+        processor.df = raw
+        return processor.clean_eda(use_schema=use_schema).df
+
+    t_generic, old = _timed(lambda: run(False))
+    t_schema, new = _timed(lambda: run(True))
+    pd.testing.assert_frame_equal(old, new)
+    mem_generic = _peak_memory(lambda: run(False))
+    mem_schema = _peak_memory(lambda: run(True))
+    print(f"{raw.shape[0]} rânduri x {raw.shape[1]} coloane")
+    print(f"generic: {t_generic * 1000:.1f} ms, vârf memorie {mem_generic / 2 ** 20:.1f} MiB")
+    print(f"schemă:  {t_schema * 1000:.1f} ms, vârf memorie {mem_schema / 2 ** 20:.1f} MiB")
+
+
+def bench_preprocess():
+    csv_files = [path for path in sorted(glob("processed/standings-with-matches-*-clean.csv"))
+                 if os.path.getsize(path) > 1]
+    raw = {path: pd.read_csv(path) for path in csv_files}
+
+    def chain():
+        for path in csv_files:
+            preprocessor = MatchPreprocessor(path)
+            preprocessor.df = raw[path].copy()
+            preprocessor.fill_missing(0) \
+                .convert_numeric_and_percentage() \
+                .split_goals_column() \
+                .drop_zero_heavy_columns() \
+                .normalize_large_stats()
+
+    def fused():
+        for path in csv_files:
+            preprocessor = MatchPreprocessor(path)
+            preprocessor.df = raw[path].copy()
+            preprocessor.run()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        t_chain, _ = _timed(chain)
+        t_fused, _ = _timed(fused)
+        mem_chain = _peak_memory(chain)
+        mem_fused = _peak_memory(fused)
+    print(f"{len(csv_files)} fișiere")
+    print(f"lanț:      {t_chain * 1000:.1f} ms, vârf memorie {mem_chain / 2 ** 20:.1f} MiB")
+    print(f"fuzionat:  {t_fused * 1000:.1f} ms, vârf memorie {mem_fused / 2 ** 20:.1f} MiB")
+
+
+def _split_goals_apply(goals):
+    """Varianta veche: un pd.Series nou pentru fiecare rând."""
+    goals = goals.astype(str)
+    return goals.apply(lambda x: pd.Series([
+        int(x.split(":")[0]) if ":" in x else int(str(int(x))[:2]),
+        int(x.split(":")[1]) if ":" in x else int(str(int(x))[2:])]))
+
+
+def bench_split_goals(n_rows=1_000_000, n_rows_apply=20_000):
+    rng = np.random.default_rng(42)
+    home = rng.integers(10, 100, n_rows)
+    away = rng.integers(0, 100, n_rows)
+    goals = pd.Series(np.where(rng.random(n_rows) < 0.5,
+                               pd.Series(home).astype(str) + ":" + pd.Series(away).astype(str),
+                               (home * 100 + away).astype(str)))
+
+    t_vec, (home_away, malformed) = _timed(lambda: MatchPreprocessor._split_goals(goals), repeat=1)
+    assert malformed == 0
+    assert (home_away["team_total_goals_home"].to_numpy() == home).all()
+
+    # varianta veche e prea lentă pentru 1M rânduri; o măsurăm pe un eșantion și extrapolăm
+    sample = goals.iloc[:n_rows_apply]
+    t_apply, old = _timed(lambda: _split_goals_apply(sample), repeat=1)
+    assert (old.to_numpy() == home_away.iloc[:n_rows_apply].to_numpy()).all()
+    t_apply_full = t_apply * n_rows / n_rows_apply
+    print(f"{n_rows} rânduri Goals")
+    print(f"apply:      {t_apply * 1000:.0f} ms pentru {n_rows_apply} rânduri (~{t_apply_full:.1f} s estimat)")
+    print(f"vectorizat: {t_vec * 1000:.0f} ms | x{t_apply_full / t_vec:.0f}")
+
+
+def bench_stat_models():
+    predictor = FootballMatchPredictor(glob("processed/standings-with-winrate-features-*.csv"))
+    X_row = predictor.feature_matrix()[:2]
+
+    for stat_mode in ("per_target", "multi_output"):
+        t_train, results = _timed(lambda: predictor.train_models(stat_mode=stat_mode), repeat=1)
+        stat_models = {key: model for key, model in predictor.models.items()
+                       if key not in predictor.CLASSIFIER_TARGETS}
+        size = len(pickle.dumps(stat_models))
+        t_predict, _ = _timed(lambda: predictor.predict_stats(X_row), repeat=20)
+        mae = {key: results[key]['mae'] for key in predictor.stat_model_keys}
+        print(f"{stat_mode}: antrenare {t_train:.2f} s | {size / 2 ** 20:.1f} MiB | "
+              f"predict {t_predict * 1000:.1f} ms | MAE mediu {np.mean(list(mae.values())):.4f}")
+        for key, value in mae.items():
+            print(f"    {key:<24} MAE {value:.4f}  R2 {results[key]['r2']:.4f}")
+
+
+def _labels_apply(df):
+    """Varianta veche: etichetele construite rând cu rând."""
+    return pd.DataFrame({
+        "goals_class": (df["team_goals"] + df["opponent_goals"]).apply(lambda x: min(int(x), 6)),
+        "score_class": df.apply(
+            lambda row: f"{min(row['team_goals'], 5)}:{min(row['opponent_goals'], 5)}", axis=1),
+        "Outcome_encoded": df.apply(
+            lambda row: 1 if row["team_goals"] > row["opponent_goals"]
+            else 2 if row["team_goals"] < row["opponent_goals"]
+            else 0, axis=1)})
+
+
+def bench_load(n_rows=1_000_000, n_rows_apply=50_000):
+    # meciuri reale eșantionate până la n_rows, ca tabelul să aibă forma unor sezoane concatenate
+    real = pd.concat([pd.read_csv(path) for path in glob("processed/standings-with-winrate-features-*.csv")
+                      if os.path.getsize(path) > 1], ignore_index=True)
+    synthetic = real.sample(n_rows, replace=True, random_state=42).reset_index(drop=True)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "synthetic.csv")
+        synthetic.to_csv(path, index=False)
+        t_read, _ = _timed(lambda: pd.read_csv(path), repeat=1)
+        t_init, predictor = _timed(lambda: FootballMatchPredictor([path]), repeat=1)
+
+    columns = ["goals_class", "score_class", "Outcome_encoded"]
+    t_vec, new = _timed(lambda: predictor._prepare_frame(synthetic.copy())[columns], repeat=1)
+    sample = synthetic.iloc[:n_rows_apply]
+    t_apply, old = _timed(lambda: _labels_apply(sample), repeat=1)
+    pd.testing.assert_frame_equal(old, new.iloc[:n_rows_apply], check_dtype=False)
+    t_apply_full = t_apply * n_rows / n_rows_apply
+    print(f"{n_rows} rânduri x {synthetic.shape[1]} coloane")
+    print(f"constructor: {t_init:.2f} s (din care read_csv {t_read:.2f} s)")
+    print(f"etichete apply:      {t_apply * 1000:.0f} ms pentru {n_rows_apply} rânduri (~{t_apply_full:.1f} s estimat)")
+    print(f"etichete vectorizat: {t_vec * 1000:.0f} ms (cu conversia Date/Time) | x{t_apply_full / t_vec:.0f}")
+
+
+def bench_engines(accuracy_tolerance=0.01, mae_tolerance=0.02):
+    """Alege, pentru fiecare familie de ținte, cel mai rapid engine care nu pierde precizie peste toleranță."""
+    predictor = FootballMatchPredictor(glob("processed/standings-with-winrate-features-*.csv"))
+    X_train, X_test, train_idx, test_idx = predictor._shared_split(0.3)
+    families = {"classifiers": [(key, (key,)) for key in predictor.CLASSIFIER_TARGETS],
+                "stats": [(key, tuple(key.rsplit("_", 1))) for key in predictor.stat_model_keys]}
+    scores = {}
+
+    for family, targets in families.items():
+        kind, metric = ("classifier", "accuracy") if family == "classifiers" else ("regressor", "mae")
+        for name, factories in ENGINES.items():
+            def fit_family():
+                fitted = []
+                for key, target in targets:
+                    y = predictor.prepare_data(*target)[1]
+                    fitted.append(_fit_and_score(key, factories[kind](), X_train, X_test,
+                                                 y[train_idx], y[test_idx], family == "stats"))
+                return fitted
+
+            t_train, fitted = _timed(fit_family, repeat=1)
+            size = len(pickle.dumps([model for _, model, _ in fitted]))
+            quality = np.mean([metrics[metric] for _, _, metrics in fitted])
+            scores[family, name] = (t_train, quality)
+            print(f"{family:<12} {name:<24} antrenare {t_train:6.2f} s | {size / 2 ** 20:6.1f} MiB | "
+                  f"{metric} mediu {quality:.4f}")
+
+        best = scores[family, "random_forest"][1]
+        eligible = [name for name in ENGINES
+                    if (scores[family, name][1] >= best - accuracy_tolerance if family == "classifiers"
+                        else scores[family, name][1] <= best * (1 + mae_tolerance))]
+        print(f"recomandat pentru {family}: {min(eligible, key=lambda name: scores[family, name][0])}")
+
+
+def bench_extraction(snapshot_dir="tests/fixtures/match_pages"):
+    """
+    Paritate și timp pentru extragerea unei pagini de meci: locatori vs. un page.evaluate per tab,
+    pe paginile de meci din tests/fixtures (câte un fișier per tab).
+    """
+    from playwright.sync_api import sync_playwright
+    from match_scraper import (HEADER_SCRIPT, LINEUPS_SCRIPT, STATISTICS_SCRIPT, SUMMARY_SCRIPT,
+                               MatchScraper, match_detail_from_header)
+
+    snapshots = sorted(glob(os.path.join(snapshot_dir, "*.html")))
+    if not snapshots:
+        print(f"Nicio pagină salvată în {snapshot_dir}")
+        return
+
+    scraper = MatchScraper(None)
+    with sync_playwright() as playwright:
+        browser = playwright.chromium.launch()
+        page = browser.new_page()
+        for path in snapshots:
+            page.goto("file://" + os.path.abspath(path))
+
+            def locators():
+                return {"header": scraper.extract_header(page).to_dict(),
+                        "summary": scraper.extract_summary(page) if page.locator(".smv__participantRow").count()
+                        else [],
+                        "statistics": scraper.extract_statistics(page),
+                        "lineups": {"formation": scraper.extract_formation(page),
+                                    "starting_lineups": scraper.extract_starting_lineups(page),
+                                    "substitutes": scraper.extract_substitutes(page),
+                                    "substituted_players": scraper.extract_substituted_players(page),
+                                    "missing_players": scraper.extract_missing_players(page),
+                                    "coaches": scraper.extract_coaches(page)}}
+
+            def bulk():
+                return {"header": match_detail_from_header(page.evaluate(HEADER_SCRIPT)).to_dict(),
+                        "summary": page.evaluate(SUMMARY_SCRIPT),
+                        "statistics": page.evaluate(STATISTICS_SCRIPT),
+                        "lineups": page.evaluate(LINEUPS_SCRIPT)}
+
+            t_locators, old = _timed(locators, repeat=1)
+            t_bulk, new = _timed(bulk)
+            assert old == new, f"{path}: extragerile diferă"
+            print(f"{os.path.basename(path)}: locatori {t_locators * 1000:.0f} ms | "
+                  f"bulk {t_bulk * 1000:.1f} ms | x{t_locators / t_bulk:.0f}")
+        browser.close()
+
+
+BENCHMARKS = {
+    "flatten": bench_flatten,
+    "clean_eda": bench_clean_eda,
+    "preprocess": bench_preprocess,
+    "split_goals": bench_split_goals,
+    "stat_models": bench_stat_models,
+    "load": bench_load,
+    "engines": bench_engines,
+    "extraction": bench_extraction,
+}
+
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        print(f"\n=== {name} ===")
+        BENCHMARKS[name]()
@@ -3,6 +3,31 @@ import pandas as pd
 import re
 
 class StandingsProcessor:
+    # tipul coloanelor cunoscute; coloanele care nu apar aici trec prin detecția generică
+    COLUMN_SCHEMA = {
+        "Rank": "float", "opponent_rank": "float",
+        "Wins": "integer", "Draws": "integer", "Loses": "integer", "Team_goals": "integer",
+        "Opponents_goals": "integer", "Goal_difference": "integer", "Points": "integer",
+        "team_goals": "integer", "opponent_goals": "integer",
+        "Team": "categorical", "Opponent": "categorical", "Date": "categorical", "Time": "categorical",
+        "Home/Away": "categorical", "Outcome": "categorical", "Target_Winner": "categorical",
+    }
+    # statisticile de meci, aplicate atât coloanei stat_<nume>_team cât și stat_<nume>_opponent
+    STAT_SCHEMA = {
+        "Ball_Possession": "percent", "Passes": "percent", "Passes_in_final_third": "percent",
+        "Crosses": "percent", "Tackles": "percent", "Long_passes": "percent",
+        "Expected_Goals_xG": "float", "xG_on_target_xGOT": "float", "Expected_assists_xA": "float",
+        "xGOT_faced": "float", "Goals_prevented": "float",
+        "Total_shots": "integer", "Shots_on_target": "integer", "Shots_off_target": "integer",
+        "Blocked_Shots": "integer", "Shots_inside_the_Box": "integer", "Shots_outside_the_Box": "integer",
+        "Big_Chances": "integer", "Hit_the_Woodwork": "integer", "Headed_Goals": "integer",
+        "Touches_in_opposition_box": "integer", "Accurate_through_passes": "integer",
+        "Corner_Kicks": "integer", "Offsides": "integer", "Free_Kicks": "integer", "Throw-ins": "integer",
+        "Fouls": "integer", "Yellow_Cards": "integer", "Red_Cards": "integer",
+        "Goalkeeper_Saves": "integer", "Clearances": "integer", "Interceptions": "integer",
+        "Duels_won": "integer", "Errors_leading_to_shot": "integer", "Errors_leading_to_goal": "integer",
+    }
+
     def __init__(self, standings_file, matches_file):
         self.standings_file = standings_file
         self.matches_file = matches_file
@@ -28,6 +53,43 @@ class StandingsProcessor:
         else:
             return "D"
 
+    def _perspective_rows(self, match, team_rank_map):
+        """Rândurile (home, away) ale unui meci, fiecare din perspectiva echipei respective."""
+        home, away = match.get("home"), match.get("away")
+        try:
+            home_goals = int(match.get("home_goals"))
+            away_goals = int(match.get("away_goals"))
+        except:
+            home_goals = away_goals = 0
+
+        stats = [(self.normalize_stat_name(stat["label"]), stat["home_value"], stat["away_value"])
+                 for stat in match.get("statistics", [])]
+
+        rows = []
+        for is_home in (True, False):
+            opponent = away if is_home else home
+            goals_for, goals_against = (home_goals, away_goals) if is_home else (away_goals, home_goals)
+            row = {
+                "Opponent": opponent,
+                "opponent_rank": team_rank_map.get(opponent, ""),
+                "Date": match.get("date", ""),
+                "Time": match.get("time", ""),
+                "Home/Away": "home" if is_home else "away",
+                "team_goals": goals_for,
+                "opponent_goals": goals_against,
+                "Outcome": self.outcome(goals_for, goals_against),
+                "Target_Winner": (
+                    "team" if goals_for > goals_against else
+                    "opponent" if goals_for < goals_against else
+                    "draw"
+                )
+            }
+            for stat_name, stat_home, stat_away in stats:
+                row[f"stat_{stat_name}_team"] = stat_home if is_home else stat_away
+                row[f"stat_{stat_name}_opponent"] = stat_away if is_home else stat_home
+            rows.append(row)
+        return rows
+
     def flatten_to_long(self):
         standings_data = self.load_json(self.standings_file)["standings"]
         matches_data = self.load_json(self.matches_file)
@@ -36,80 +98,90 @@ class StandingsProcessor:
             matches_data = matches_data["matches"]
 
         team_rank_map = {team["team"]: team["rank"] for team in standings_data}
-        flattened_rows = []
 
+        # index echipă -> meciuri, construit într-o singură trecere prin lista de meciuri
+        team_index = {}
+        for match in matches_data:
+            home, away = match.get("home"), match.get("away")
+            if home not in team_rank_map and away not in team_rank_map:
+                continue
+            home_row, away_row = self._perspective_rows(match, team_rank_map)
+            sort_key = (match.get("date", ""), match.get("time", ""))
+            team_index.setdefault(home, []).append((sort_key, home_row))
+            if away != home:
+                team_index.setdefault(away, []).append((sort_key, away_row))
+
+        flattened_rows = []
         for team in standings_data:
-            team_name = team["team"]
-            team_matches = [m for m in matches_data if m.get("home") == team_name or m.get("away") == team_name]
-            team_matches.sort(key=lambda x: (x.get("date", ""), x.get("time", "")))
-
-            for match in team_matches:
-                is_home = match.get("home") == team_name
-                opponent = match.get("away") if is_home else match.get("home")
-
-                try:
-                    goals_for = int(match.get("home_goals") if is_home else match.get("away_goals"))
-                    goals_against = int(match.get("away_goals") if is_home else match.get("home_goals"))
-                except:
-                    goals_for = goals_against = 0
-
-                row = {
-                    "Rank": team["rank"],
-                    "Team": team_name,
-                    "Wins": team["W"],
-                    "Draws": team["D"],
-                    "Loses": team["L"],
-                    "Team_goals": team["GF"],
-                    "Opponents_goals": team["GA"],
-                    "Goal_difference": team["GD"],
-                    "Points": team["Pts"],
-                    "Opponent": opponent,
-                    "opponent_rank": team_rank_map.get(opponent, ""),
-                    "Date": match.get("date", ""),
-                    "Time": match.get("time", ""),
-                    "Home/Away": "home" if is_home else "away",
-                    "team_goals": goals_for,
-                    "opponent_goals": goals_against,
-                    "Outcome": self.outcome(goals_for, goals_against),
-                    "Target_Winner": (
-                        "team" if goals_for > goals_against else
-                        "opponent" if goals_for < goals_against else
-                        "draw"
-                    )
-                }
-
-                for stat in match.get("statistics", []):
-                    stat_name = self.normalize_stat_name(stat["label"])
-                    stat_home, stat_away = stat["home_value"], stat["away_value"]
-
-                    if is_home:
-                        row[f"stat_{stat_name}_team"] = stat_home
-                        row[f"stat_{stat_name}_opponent"] = stat_away
-                    else:
-                        row[f"stat_{stat_name}_team"] = stat_away
-                        row[f"stat_{stat_name}_opponent"] = stat_home
-
-                flattened_rows.append(row)
+            team_row = {
+                "Rank": team["rank"],
+                "Team": team["team"],
+                "Wins": team["W"],
+                "Draws": team["D"],
+                "Loses": team["L"],
+                "Team_goals": team["GF"],
+                "Opponents_goals": team["GA"],
+                "Goal_difference": team["GD"],
+                "Points": team["Pts"],
+            }
+            team_matches = sorted(team_index.get(team["team"], []), key=lambda x: x[0])
+            flattened_rows.extend({**team_row, **match_row} for _, match_row in team_matches)
 
         self.df = pd.DataFrame(flattened_rows)
         return self
 
-    def clean_eda(self):
+    @classmethod
+    def column_kind(cls, col):
+        if col in cls.COLUMN_SCHEMA:
+            return cls.COLUMN_SCHEMA[col]
+        match = re.fullmatch(r"stat_(.+)_(team|opponent)", col)
+        if match:
+            return cls.STAT_SCHEMA.get(match.group(1))
+        return None
+
+    @staticmethod
+    def _parse_percent(series):
+        return (series
+                .astype(str)
+                .str.replace(",", ".")
+                .str.extract(r"(\d+\.?\d*)", expand=False)
+                .astype(float)
+                / 100.0)
+
+    @staticmethod
+    def _parse_numeric(series):
+        try:
+            return pd.to_numeric(series)
+        except (ValueError, TypeError):
+            return series
+
+    @classmethod
+    def _parse_generic(cls, series):
+        if series.astype(str).str.contains("%").any():
+            series = cls._parse_percent(series)
+        return cls._parse_numeric(series)
+
+    @classmethod
+    def _parse_column(cls, col, series):
+        kind = cls.column_kind(col)
+        if kind == "categorical":
+            return series
+        if kind == "percent":
+            return cls._parse_percent(series)
+        if kind in ("integer", "float"):
+            parsed = pd.to_numeric(series, errors="coerce")
+            # valori neașteptate (text, procente) -> detecția generică, ca înainte
+            if not (parsed.isna() & series.notna()).any():
+                return parsed
+        return cls._parse_generic(series)
+
+    def clean_eda(self, use_schema=True):
         if self.df is None:
             raise ValueError("Dataframe is empty. Call flatten_to_long() first.")
-        df_clean = self.df.copy()
-
-        for col in df_clean.columns:
-            if df_clean[col].astype(str).str.contains("%").any():
-                df_clean[col] = (
-                    df_clean[col]
-                    .astype(str)
-                    .str.replace(",", ".")
-                    .str.extract(r"(\d+\.?\d*)")
-                    .astype(float)
-                    / 100.0)
-
-            df_clean[col] = pd.to_numeric(df_clean[col], errors="ignore")
+
+        parse = self._parse_column if use_schema else lambda col, series: self._parse_generic(series)
+        df_clean = pd.DataFrame({col: parse(col, self.df[col]) for col in self.df.columns},
+                                index=self.df.index)
 
         self.df = df_clean.fillna(0)
         return self
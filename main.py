@@ -1,11 +1,13 @@
 from standings_scraper import StandingsScraper
-from match_scraper import MatchScraper
+from match_scraper import AsyncMatchScraper, MatchScraper
 from concatenate_data import StandingsProcessor
 from match_preprocessor import MatchPreprocessor
 from win_rate_feature_engineering import FootballWinRateFeatures
 from match_predictor import FootballMatchPredictor
+from prediction_logger import get_prediction_logger
 import os
 import json
+import re
 
 
 def scrape_and_save_standings(standings_url, filename):
@@ -16,23 +18,116 @@ def scrape_and_save_standings(standings_url, filename):
     scraper.stop()
 
 
-def scrape_and_save_matches(matches_url, filename):
-    scraper = MatchScraper(matches_url, headless=False)
-    scraper.start()
-    match_ids = scraper.get_all_match_ids()
-    print(f"Found {len(match_ids)} matches")
+def scrape_match_details(scraper, match_ids, concurrency=1):
+    """
+    Extrage paginile de meci. Implicit (concurrency=1) secvențial, cu extractorii pe bază de locatori;
+    cu concurrency > 1 le deschide în paralel prin AsyncMatchScraper (doar scripturile page.evaluate),
+    într-un pool de contexte de browser pornit cu aceleași setări (headless, blocarea resurselor).
+    """
     matches_data = []
 
+    if concurrency > 1:
+        scraper.stop()
+        for match_detail in AsyncMatchScraper.run(match_ids, concurrency=concurrency, headless=scraper.headless,
+                                                  block_resources=scraper.block_resources):
+            if match_detail is not None:
+                matches_data.append(match_detail.to_dict())
+        return matches_data
+
     for i, m_id in enumerate(match_ids):
         try:
             match_url = f"https://www.flashscore.com/match/{m_id}/#/match-summary"
             print(f"Scraping match {i + 1}/{len(match_ids)} -> {match_url}")
             match_detail = scraper.open_match_and_extract(match_url)
+            match_detail.match_id = m_id
             matches_data.append(match_detail.to_dict())
         except Exception as e:
             print(f"Error scraping match {i + 1}: {e}")
 
     scraper.stop()
+    return matches_data
+
+
+def _match_day(date_text):
+    """Ziua și luna ("zz.ll.") dintr-o dată din lista de rezultate ("31.05. 21:00") sau din fișier ("31.05.2025")."""
+    found = re.match(r"\s*(\d{1,2}\.\d{1,2}\.)", date_text or "")
+    return found.group(1) if found else ""
+
+
+def match_saved_records(existing, match_index):
+    """
+    Asociază rândurilor din match_index meciurile deja salvate: întoarce {id: meci} și meciurile fără "id"
+    rămase neasociate. Fișierele vechi nu au "id"; acolo meciul se recunoaște după (gazde, oaspeți) și ziua
+    din listă, iar fiecare meci salvat e folosit o singură dată, în ordinea listei, ca perechile care se
+    întâlnesc de mai multe ori într-un sezon (play-off) să nu ajungă pe același meci.
+    """
+    by_id = {match["id"]: match for match in existing if match.get("id")}
+    by_pair = {}
+    for match in existing:
+        if not match.get("id"):
+            by_pair.setdefault((match["home"], match["away"]), []).append(match)
+
+    previous = {}
+    used = set()
+    for item in match_index:
+        match = by_id.get(item["id"])
+        if match is None:
+            day = _match_day(item.get("date_time"))
+            candidates = [candidate for candidate in by_pair.get((item["home"], item["away"]), [])
+                          if id(candidate) not in used and (not day or _match_day(candidate["date"]) == day)]
+            if candidates:
+                match = candidates[0]
+                used.add(id(match))
+        if match is not None:
+            previous[item["id"]] = {"id": item["id"], **match}
+
+    unmatched = [match for match in existing if not match.get("id") and id(match) not in used]
+    return previous, unmatched
+
+
+def update_matches(existing, match_index, scrape):
+    """
+    Combină meciurile salvate cu lista curentă de rezultate: scrape(match_ids) extrage doar meciurile noi
+    sau neterminate. Întoarce lista finală, în ordinea paginii de rezultate.
+    """
+    previous, unmatched = match_saved_records(existing, match_index)
+    match_ids = [item["id"] for item in match_index
+                 if previous.get(item["id"], {}).get("status") not in MatchScraper.FINISHED_STATUSES]
+    if existing:
+        print(f"{len(match_index) - len(match_ids)} meciuri terminate sunt deja salvate, "
+              f"se extrag {len(match_ids)}")
+    scraped = {match["id"]: match for match in scrape(match_ids)}
+
+    # dacă extragerea eșuează rămâne varianta salvată
+    matches_data = [scraped.get(item["id"]) or previous.get(item["id"]) for item in match_index]
+    matches_data = [match for match in matches_data if match is not None]
+
+    # meciurile salvate care nu mai apar în listă se păstrează la final; un meci fără "id" tocmai extras din nou
+    # (numele din listă diferă de cele din pagina meciului) nu se mai păstrează și în varianta veche
+    listed = {item["id"] for item in match_index}
+    rescraped = {(match["home"], match["away"], match["date"]) for match in scraped.values()}
+    matches_data += [match for match in existing if match.get("id") and match["id"] not in listed]
+    matches_data += [match for match in unmatched if (match["home"], match["away"], match["date"]) not in rescraped]
+    return matches_data
+
+
+def scrape_and_save_matches(matches_url, filename, concurrency=1, incremental=True):
+    """
+    Extrage rezultatele unei ligi. Cu incremental=True și un fișier existent, extrage doar meciurile
+    care lipsesc din fișier sau nu erau încă terminate, apoi le combină cu cele salvate (update_matches).
+    """
+    existing = []
+    if incremental and os.path.exists(filename):
+        with open(filename, "r", encoding="utf-8") as f:
+            existing = json.load(f).get("matches", [])
+
+    scraper = MatchScraper(matches_url, headless=False)
+    scraper.start()
+    match_index = scraper.get_match_index()
+    print(f"Found {len(match_index)} matches")
+
+    matches_data = update_matches(existing, match_index,
+                                  lambda match_ids: scrape_match_details(scraper, match_ids, concurrency))
 
     os.makedirs("processed", exist_ok=True)
     with open(filename, "w", encoding="utf-8") as f:
@@ -40,24 +135,12 @@ def scrape_and_save_matches(matches_url, filename):
     print(f"Matches saved to {filename}")
 
 
-def scrape_and_save_fixtures(fixtures_url, filename):
+def scrape_and_save_fixtures(fixtures_url, filename, concurrency=1):
     scraper = MatchScraper(fixtures_url, headless=False)
     scraper.start()
     fixtures_ids = scraper.get_all_match_ids()
     print(f"Found {len(fixtures_ids)} fixtures")
-
-    fixtures_data = []
-
-    for i, m_id in enumerate(fixtures_ids):
-        try:
-            fixture_url = f"https://www.flashscore.com/match/{m_id}/#/match-summary"
-            print(f"Scraping match {i + 1}/{len(fixtures_ids)} -> {fixture_url}")
-            match_detail = scraper.open_match_and_extract(fixture_url)
-            fixtures_data.append(match_detail.to_dict())
-        except Exception as e:
-            print(f"Error scraping match {i + 1}: {e}")
-
-    scraper.stop()
+    fixtures_data = scrape_match_details(scraper, fixtures_ids, concurrency)
 
     os.makedirs("processed", exist_ok=True)
     with open(filename, "w", encoding="utf-8") as f:
@@ -193,8 +276,8 @@ def main():
         if not os.path.exists(standings_file):
             scrape_and_save_standings(standings_url, standings_file)
 
-        # 1b. Scrape results dacă nu există deja
-        if not os.path.exists(matches_file):
+        # 1b. Scrape results: complet dacă nu există deja, incremental pentru sezonul în curs (are fixtures)
+        if not os.path.exists(matches_file) or fixtures_url:
             scrape_and_save_matches(results_url, matches_file)
 
         # 1c. Scrape fixtures dacă există URL și nu există fișier
@@ -207,26 +290,27 @@ def main():
         cleaned_csv = f"processed/standings-with-matches-{league}-clean.csv"
         processor.save_csv(cleaned_csv)
 
-        # 3. Preprocess
+        # 3. Preprocess (parametrii salvați la o rulare anterioară se refolosesc, nu se recalculează)
+        preprocessed_output = f"processed/standings-with-matches-{league}-cleaned.csv"
+        params_file = MatchPreprocessor.params_path(preprocessed_output)
         preprocessor = MatchPreprocessor(cleaned_csv)
+        if os.path.exists(params_file):
+            preprocessor.load_params(params_file)
         preprocessor.load_csv() \
-            .fill_missing(0) \
-            .convert_numeric_and_percentage() \
-            .split_goals_column() \
-            .drop_zero_heavy_columns() \
-            .normalize_large_stats() \
-            .save_csv(f"processed/standings-with-matches-{league}-cleaned.csv")
+            .run() \
+            .save_csv(preprocessed_output)
         preprocessed_csv = f"processed/standings-with-matches-{league}-clean.csv"
 
-        # 4. Winrate features
+        # 4. Winrate features (incremental dacă există deja CSV-ul și starea salvată)
+        winrate_csv = f"processed/standings-with-winrate-features-{league}.csv"
         ff = FootballWinRateFeatures(preprocessed_csv)
-        ff.encode_columns().create_winrate_features(N_recent=5) \
-            .save_csv(f"processed/standings-with-winrate-features-{league}.csv")
-        winrate_files.append(f"processed/standings-with-winrate-features-{league}.csv")
+        ff.encode_columns().append_winrate_features(winrate_csv, N_recent=5) \
+            .save_csv(winrate_csv)
+        winrate_files.append(winrate_csv)
 
-    # 5. Train modele
+    # 5. Train modele (sau încărcăm modelele salvate și le actualizăm incremental cu meciurile noi)
     predictor = FootballMatchPredictor(winrate_files)
-    predictor.train_models()
+    predictor.update_or_train(n_jobs=-1)
 
     # 6. Testăm toate modelele și salvăm CSV cu y_test vs y_pred
     csv_test_path = "processed/all_predictions.csv"
@@ -244,6 +328,8 @@ def main():
 
         predictions = predictor.predict_future_match(home_team, away_team)
         if predictions:
+            # jurnalul scrie în lot; în modul interactiv rândul se scrie imediat, înainte de mesaj
+            get_prediction_logger().flush()
             print("\nRezultatele au fost salvate și în predictions_log.csv")
 
         cont = input("\nVrei să introduci alt meci? (da/nu): ").strip().lower()
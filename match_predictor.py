@@ -1,23 +1,127 @@
+import hashlib
+import json
 import os
+import threading
+import time
 import warnings
+from collections import OrderedDict
+from glob import glob
 
+import joblib
+import numpy as np
 import pandas as pd
-from sklearn.ensemble import RandomForestRegressor, RandomForestClassifier
+from joblib import Parallel, delayed
+from sklearn.compose import TransformedTargetRegressor
+from sklearn.ensemble import (HistGradientBoostingClassifier, HistGradientBoostingRegressor,
+                              RandomForestClassifier, RandomForestRegressor)
 from sklearn.metrics import accuracy_score, mean_absolute_error, r2_score
 from sklearn.model_selection import train_test_split
+from sklearn.multioutput import MultiOutputRegressor
 from sklearn.preprocessing import LabelEncoder
 from sklearn.preprocessing import StandardScaler
 
+from prediction_logger import get_prediction_logger
+
 warnings.filterwarnings('ignore')
 
+DEFAULT_MODEL_PATH = "processed/models/match_predictor.joblib"
+
+# estimatorii disponibili pentru fiecare familie de ținte: clasificatoare (outcome/goals/score) și statistici
+ENGINES = {
+    "random_forest": {
+        "classifier": lambda: RandomForestClassifier(n_estimators=50, random_state=42),
+        "regressor": lambda: RandomForestRegressor(n_estimators=50, random_state=42)},
+    "hist_gradient_boosting": {
+        "classifier": lambda: HistGradientBoostingClassifier(random_state=42),
+        "regressor": lambda: HistGradientBoostingRegressor(random_state=42)}}
+
+DEFAULT_ENGINE = {"classifiers": "random_forest", "stats": "random_forest"}
+
+
+def _fit_and_score(model_key, model, X_train, X_test, y_train, y_test, regression):
+    """Antrenează un singur model; rulează și în procesele worker din train_models(n_jobs=...)."""
+    model.fit(X_train, y_train)
+    y_pred = model.predict(X_test)
+
+    if regression:
+        # pentru modelul multi-output metricile sunt per coloană țintă
+        metrics = {'mae': mean_absolute_error(y_test, y_pred, multioutput='raw_values'),
+                   'r2': r2_score(y_test, y_pred, multioutput='raw_values')}
+        if np.ndim(y_test) == 1:
+            metrics = {name: float(values[0]) for name, values in metrics.items()}
+    else:
+        metrics = {'accuracy': accuracy_score(y_test, y_pred)}
+    return model_key, model, metrics
+
+
+def _backtest_fold(fold, model_key, model, X, y, train_idx, test_idx, regression):
+    """Un model pe un fold walk-forward; X e matricea comună (memmap în procesele worker)."""
+    _, model, metrics = _fit_and_score(model_key, model, X[train_idx], X[test_idx],
+                                       y[train_idx], y[test_idx], regression)
+    return fold, model_key, metrics
+
+
+class PredictionCache:
+    """Cache LRU cu TTL pentru predicții, sigur la acces din mai multe sesiuni (thread-uri)."""
+
+    def __init__(self, max_size=256, ttl=3600):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (self.ttl is None or time.monotonic() - entry[0] < self.ttl):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
 
 class FootballMatchPredictor:
+    CLASSIFIER_TARGETS = ['outcome', 'goals', 'score']
+    STAT_TARGETS = ['corners', 'shots_on_target', 'possession', 'yellow_cards',
+                    'fouls', 'tackles', 'passes', 'shots_total', 'xg']
+    STAT_COLUMNS = {
+        'corners': 'stat_Corner_Kicks',
+        'shots_on_target': 'stat_Shots_on_target',
+        'possession': 'stat_Ball_Possession',
+        'yellow_cards': 'stat_Yellow_Cards',
+        'fouls': 'stat_Fouls',
+        'tackles': 'stat_Tackles',
+        'passes': 'stat_Passes',
+        'shots_total': 'stat_Total_shots',
+        'xg': 'stat_Expected_Goals_xG'}
+
     def __init__(self, csv_paths: list):
         dfs = []
+        self.csv_paths = []
         for path in csv_paths:
             try:
                 df = pd.read_csv(path)
                 dfs.append(df)
+                self.csv_paths.append(path)
             except FileNotFoundError:
                 continue
             except Exception as e:
@@ -27,10 +131,22 @@ class FootballMatchPredictor:
             raise ValueError("Niciun fișier CSV nu a putut fi încărcat")
 
         self.df = pd.concat(dfs, ignore_index=True)
+        self.fingerprint = self.data_fingerprint(self.csv_paths)
 
         self.team_encoder = LabelEncoder()
         self.scalers = {}
         self.models = {}
+        self._matrix = None
+        self._splits = {}
+        self._latest = None
+        self._h2h = None
+        self.engine = None
+        self.stat_mode = None
+        self.trained_keys = None
+        self.updates_since_rebuild = 0
+        # versiunea modelelor crește la fiecare antrenare/încărcare și face parte din cheia cache-ului
+        self.model_version = 0
+        self.prediction_cache = PredictionCache()
 
         self.all_features = [
             'win_rate_global', 'win_rate_lastN', 'home_win_rate', 'away_win_rate',
@@ -52,31 +168,215 @@ class FootballMatchPredictor:
             'Opponents_goals', 'Goal_difference', 'Points']
 
         self.all_features.extend(self.stat_features)
-        self.df['total_goals'] = self.df['team_goals'] + self.df['opponent_goals']
-        self.df['goals_class'] = self.df['total_goals'].apply(lambda x: min(int(x), 6))
-        self.df["score_class"] = self.df.apply(
-            lambda row: f"{min(row['team_goals'], 5)}:{min(row['opponent_goals'], 5)}", axis=1)
+        self.df = self._prepare_frame(self.df)
+        self._clean_data()
+        self._encode_teams()
 
-        if "Date" in self.df.columns:
-            self.df["Date"] = pd.to_datetime(self.df["Date"], dayfirst=True, errors='coerce').dt.date
-        if "Time" in self.df.columns:
-            self.df["Time"] = pd.to_datetime(self.df["Time"], format="%H:%M", errors='coerce').dt.time
+    def _prepare_frame(self, df):
+        df['total_goals'] = df['team_goals'] + df['opponent_goals']
+        df['goals_class'] = df['total_goals'].astype(np.int64).clip(upper=6)
+        df["score_class"] = df['team_goals'].clip(upper=5).astype(str) + ":" + \
+            df['opponent_goals'].clip(upper=5).astype(str)
 
-        self._clean_data()
+        if "Date" in df.columns:
+            df["Date"] = pd.to_datetime(df["Date"], dayfirst=True, errors='coerce').dt.date
+        if "Time" in df.columns:
+            df["Time"] = pd.to_datetime(df["Time"], format="%H:%M", errors='coerce').dt.time
 
+        df["Outcome_encoded"] = np.select(
+            [df["team_goals"] > df["opponent_goals"], df["team_goals"] < df["opponent_goals"]], [1, 2], 0)
+
+        if 'Home_encoded' not in df.columns:
+            df['Home_encoded'] = (df['Home/Away'] == 'Home').astype(np.int64)
+        return df
+
+    def _encode_teams(self):
         all_teams = pd.concat([self.df["Team"], self.df["Opponent"]]).unique()
         self.team_encoder.fit(all_teams)
         self.df["Team_encoded"] = self.team_encoder.transform(self.df["Team"])
         self.df["Opponent_encoded"] = self.team_encoder.transform(self.df["Opponent"])
+        self._latest = None
+        self._h2h = None
 
-        self.df["Outcome_encoded"] = self.df.apply(
-            lambda row: 1 if row["team_goals"] > row["opponent_goals"]
-            else 2 if row["team_goals"] < row["opponent_goals"]
-            else 0, axis=1)
+    def append_csv(self, csv_paths):
+        """Adaugă meciuri noi din CSV-uri; indexul ultimei stări a echipelor se reconstruiește la următoarea căutare."""
+        dfs = []
+        for path in csv_paths:
+            try:
+                dfs.append(pd.read_csv(path))
+                self.csv_paths.append(path)
+            except Exception:
+                continue
+        if not dfs:
+            return self
 
-        if 'Home_encoded' not in self.df.columns:
-            self.df['Home_encoded'] = self.df['Home/Away'].apply(
-                lambda x: 1 if x == 'Home' else 0)
+        self.df = pd.concat([self.df, self._prepare_frame(pd.concat(dfs, ignore_index=True))], ignore_index=True)
+        self._clean_data()
+        self._encode_teams()
+        self.fingerprint = self.data_fingerprint(self.csv_paths)
+        self._matrix = None
+        self.prediction_cache.clear()
+        return self
+
+    def team_index(self):
+        """
+        Ultima stare a fiecărei echipe: rândul celui mai recent meci (după Date/Time, nu după ordinea din CSV),
+        indexat după Team_encoded. Se construiește o singură dată și se invalidează când se adaugă date.
+        """
+        if self._latest is None:
+            order = pd.DataFrame({
+                "team": self.df["Team_encoded"].to_numpy(),
+                "date": pd.to_datetime(self.df["Date"], errors='coerce').to_numpy()
+                if "Date" in self.df.columns else pd.NaT,
+                "time": self.df["Time"].astype(str).replace({"NaT": "", "nan": "", "None": ""}).to_numpy()
+                if "Time" in self.df.columns else ""})
+            # sortare stabilă: la dată/oră egale sau lipsă rămâne ultimul rând din fișier
+            positions = order.sort_values(["date", "time"], kind="mergesort", na_position="first") \
+                .groupby("team", sort=False).tail(1).index
+            self._latest = self.df.iloc[positions].set_index("Team_encoded", drop=False).sort_index()
+            self._latest_rows = self._latest.to_dict("index")
+            self._team_ids = {team: i for i, team in enumerate(self.team_encoder.classes_)}
+        return self._latest
+
+    @staticmethod
+    def data_fingerprint(csv_paths):
+        """Hash al conținutului CSV-urilor de intrare; se schimbă la orice meci nou sau modificat."""
+        digest = hashlib.sha256()
+        for path in sorted(csv_paths):
+            digest.update(os.path.basename(path).encode("utf-8"))
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(chunk)
+        return digest.hexdigest()
+
+    def save(self, path=DEFAULT_MODEL_PATH):
+        if not self.models:
+            raise ValueError("Modelele nu sunt antrenate. Apelează train_models() mai întâi.")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        joblib.dump({
+            "fingerprint": self.fingerprint,
+            "models": self.models,
+            "scalers": self.scalers,
+            "engine": self.engine,
+            "stat_mode": self.stat_mode,
+            "trained_keys": self.trained_keys,
+            "updates_since_rebuild": self.updates_since_rebuild,
+            "team_encoder": self.team_encoder,
+            "all_features": self.all_features,
+            "stat_features": self.stat_features}, path)
+        print(f"Modele salvate în {path}")
+        return self
+
+    def load(self, path=DEFAULT_MODEL_PATH, allow_stale=False):
+        """
+        Încarcă modelele salvate; întoarce False dacă lipsesc sau au fost antrenate pe alte date.
+        Cu allow_stale=True le încarcă oricum (pentru update_models), păstrând encoderul datelor curente.
+        """
+        if not os.path.exists(path):
+            return False
+        artifact = joblib.load(path)
+        stale = artifact.get("fingerprint") != self.fingerprint
+        if stale and not allow_stale:
+            print("Datele s-au schimbat de la ultima antrenare, modelele trebuie reantrenate")
+            return False
+
+        self.models = artifact["models"]
+        self.scalers = artifact["scalers"]
+        self.engine = artifact.get("engine") or {family: "random_forest" for family in DEFAULT_ENGINE}
+        self.stat_mode = artifact.get("stat_mode") or ("multi_output" if 'stats' in self.models else "per_target")
+        self.trained_keys = artifact.get("trained_keys")
+        self.updates_since_rebuild = artifact.get("updates_since_rebuild", 0)
+        if not stale:
+            self.team_encoder = artifact["team_encoder"]
+        self.all_features = artifact["all_features"]
+        self.stat_features = artifact["stat_features"]
+        self._matrix = None
+        self._latest = None
+        self._h2h = None
+        self._models_changed()
+        return True
+
+    def load_or_train(self, path=DEFAULT_MODEL_PATH, n_jobs=1, stat_mode="per_target", engine=None):
+        if not self.load(path) or self.stat_mode != stat_mode \
+                or self.engine != self.resolve_engine(engine):
+            self.train_models(n_jobs=n_jobs, stat_mode=stat_mode, engine=engine)
+            self.save(path)
+        return self
+
+    def update_or_train(self, path=DEFAULT_MODEL_PATH, n_jobs=1, full_rebuild_every=10, stat_mode="per_target",
+                        **update_kwargs):
+        """
+        Reîmprospătare zilnică: dacă există modele salvate, adaugă arbori antrenați pe meciurile noi
+        (update_models); la fiecare full_rebuild_every actualizări, sau când actualizarea incrementală
+        nu e posibilă, reantrenează totul de la zero cu engine-ul și stat_mode-ul modelelor salvate.
+        stat_mode se folosește doar la prima antrenare.
+        """
+        if not self.load(path, allow_stale=True):
+            return self.load_or_train(path, n_jobs=n_jobs, stat_mode=stat_mode)
+        if self.trained_keys is not None and np.isin(self._row_keys(), self.trained_keys).all():
+            return self
+
+        if self.trained_keys is None or self.updates_since_rebuild + 1 >= full_rebuild_every \
+                or not self.update_models(**update_kwargs):
+            print("Reantrenare completă a modelelor")
+            self.train_models(n_jobs=n_jobs, stat_mode=self.stat_mode, engine=self.engine)
+        self.save(path)
+        return self
+
+    def _row_keys(self):
+        """Un hash per meci (echipă, adversar, dată, oră), ca să știm ce rânduri au văzut deja modelele."""
+        columns = [c for c in ["Team", "Opponent", "Date", "Time"] if c in self.df.columns]
+        return pd.util.hash_pandas_object(self.df[columns].astype(str), index=False).to_numpy()
+
+    def update_models(self, new_trees=10, max_trees=50, recent_window=2000):
+        """
+        Actualizare incrementală cu warm_start: fiecare pădure primește new_trees arbori noi, antrenați pe
+        meciurile nevăzute plus cele mai recente recent_window rânduri, iar cei mai vechi arbori sunt
+        retrași ca ansamblul să rămână la max_trees. Un clasificator ale cărui clase nu apar toate în
+        fereastra recentă se reantrenează complet. Întoarce False dacă modelele nu permit actualizarea
+        (alt engine decât random_forest sau modelul multi-output).
+        """
+        if self.engine != {family: "random_forest" for family in DEFAULT_ENGINE} or 'stats' in self.models:
+            return False
+
+        keys = self._row_keys()
+        new_rows = ~np.isin(keys, self.trained_keys)
+        dates = pd.to_datetime(self.df["Date"], errors='coerce').fillna(pd.Timestamp.min) \
+            if "Date" in self.df.columns else pd.Series(np.arange(len(self.df)))
+        recent = np.zeros(len(self.df), dtype=bool)
+        recent[np.argsort(dates.to_numpy(), kind="stable")[-recent_window:]] = True
+        X_train, _, train_idx, _ = self._shared_split(0.3)
+        # doar rânduri din split-ul de antrenare, ca test_all_models_and_save să rămână pe date nevăzute
+        rows = np.intersect1d(np.flatnonzero(new_rows | recent), train_idx)
+
+        X = self.feature_matrix()[rows]
+        refitted = []
+        for model_key, model in self.models.items():
+            if model_key in self.CLASSIFIER_TARGETS:
+                y = self.prepare_data(model_key)[1]
+                # arborii noi trebuie să vadă exact aceleași clase ca pădurea existentă;
+                # altfel doar acest model se reantrenează de la zero
+                if not np.array_equal(np.unique(y[rows]), model.classes_):
+                    self.models[model_key] = ENGINES["random_forest"]["classifier"]().fit(X_train, y[train_idx])
+                    refitted.append(model_key)
+                    continue
+                X_fit, y = X, y[rows]
+            else:
+                target, team_type = model_key.rsplit("_", 1)
+                y = self.prepare_data(target, team_type)[1][rows]
+                X_fit = self.scalers[model_key].transform(X)
+
+            model.set_params(warm_start=True, n_estimators=len(model.estimators_) + new_trees)
+            model.fit(X_fit, y)
+            model.estimators_ = model.estimators_[-max_trees:]
+            model.set_params(warm_start=False, n_estimators=len(model.estimators_))
+
+        self.trained_keys = keys
+        self.updates_since_rebuild += 1
+        self._models_changed()
+        print(f"Modele actualizate incremental cu {int(new_rows.sum())} meciuri noi"
+              + (f" (reantrenate complet: {', '.join(refitted)})" if refitted else ""))
+        return True
 
     def _clean_data(self):
 
@@ -90,86 +390,150 @@ class FootballMatchPredictor:
         critical_columns = ['Team', 'Opponent', 'team_goals', 'opponent_goals']
         self.df = self.df.dropna(subset=critical_columns)
 
-    def prepare_data(self, target_type='outcome', for_team='home'):
-        available_features = [f for f in self.all_features if f in self.df.columns]
-        X = self.df[available_features]
-
+    def feature_matrix(self):
+        """Matricea de feature-uri (float32, contiguă), construită o singură dată pentru toate țintele."""
+        if self._matrix is None:
+            available_features = [f for f in self.all_features if f in self.df.columns]
+            self._matrix = np.ascontiguousarray(self.df[available_features].to_numpy(dtype=np.float32))
+            self._splits = {}
+        return self._matrix
+
+    def split_indices(self, test_size=0.3):
+        """Indicii train/test, calculați o dată per test_size și folosiți de toate țintele."""
+        if test_size not in self._splits:
+            self._splits[test_size] = train_test_split(
+                np.arange(len(self.feature_matrix())), test_size=test_size, random_state=42)
+        return self._splits[test_size]
+
+    def _shared_split(self, test_size=0.3):
+        X = self.feature_matrix()
+        train_idx, test_idx = self.split_indices(test_size)
+        return X[train_idx], X[test_idx], train_idx, test_idx
+
+    def _target_column(self, target_type, for_team='home'):
         if target_type == 'outcome':
-            y = self.df["Outcome_encoded"]
-        elif target_type == 'goals':
-            y = self.df["goals_class"]
-        elif target_type == 'score':
-            y = self.df["score_class"]
-        else:
-            stat_mapping = {
-                'corners': 'stat_Corner_Kicks_team' if for_team == 'home' else 'stat_Corner_Kicks_opponent',
-                'shots_on_target': 'stat_Shots_on_target_team' if for_team == 'home' else 'stat_Shots_on_target_opponent',
-                'possession': 'stat_Ball_Possession_team' if for_team == 'home' else 'stat_Ball_Possession_opponent',
-                'yellow_cards': 'stat_Yellow_Cards_team' if for_team == 'home' else 'stat_Yellow_Cards_opponent',
-                'fouls': 'stat_Fouls_team' if for_team == 'home' else 'stat_Fouls_opponent',
-                'tackles': 'stat_Tackles_team' if for_team == 'home' else 'stat_Tackles_opponent',
-                'passes': 'stat_Passes_team' if for_team == 'home' else 'stat_Passes_opponent',
-                'shots_total': 'stat_Total_shots_team' if for_team == 'home' else 'stat_Total_shots_opponent',
-                'xg': 'stat_Expected_Goals_xG_team' if for_team == 'home' else 'stat_Expected_Goals_xG_opponent'}
-
-            if target_type in stat_mapping:
-                y = self.df[stat_mapping[target_type]]
-            else:
-                raise ValueError(f"Tip țintă necunoscut: {target_type}")
-        return X, y
-
-    def train_models(self):
-
-        self.models = {
-            'outcome': RandomForestClassifier(n_estimators=50, random_state=42),
-            'goals': RandomForestClassifier(n_estimators=50, random_state=42),
-            'score': RandomForestClassifier(n_estimators=50, random_state=42),
-        }
+            return "Outcome_encoded"
+        if target_type == 'goals':
+            return "goals_class"
+        if target_type == 'score':
+            return "score_class"
+        if target_type in self.STAT_COLUMNS:
+            return f"{self.STAT_COLUMNS[target_type]}_{'team' if for_team == 'home' else 'opponent'}"
+        raise ValueError(f"Tip țintă necunoscut: {target_type}")
 
-        stat_targets = ['corners', 'shots_on_target', 'possession', 'yellow_cards',
-                        'fouls', 'tackles', 'passes', 'shots_total', 'xg']
-
-        for target in stat_targets:
-            for team_type in ['home', 'away']:
-                model_key = f"{target}_{team_type}"
-                self.models[model_key] = RandomForestRegressor(n_estimators=50, random_state=42)
-
-        results = {}
-
-        for target_name in ['outcome', 'goals', 'score']:
-
-            X, y = self.prepare_data(target_name)
-            X_train, X_test, y_train, y_test = train_test_split(
-                X, y, test_size=0.3, random_state=42)
-
-            self.models[target_name].fit(X_train, y_train)
-            y_pred = self.models[target_name].predict(X_test)
-
-            accuracy = accuracy_score(y_test, y_pred)
-            results[target_name] = {'accuracy': accuracy}
+    def prepare_data(self, target_type='outcome', for_team='home'):
+        return self.feature_matrix(), self.df[self._target_column(target_type, for_team)].to_numpy()
+
+    @property
+    def stat_model_keys(self):
+        return [f"{target}_{team_type}" for target in self.STAT_TARGETS for team_type in ['home', 'away']]
+
+    @staticmethod
+    def resolve_engine(engine=None):
+        """Numele unui engine (pentru toate țintele) sau un dict {"classifiers": ..., "stats": ...}."""
+        if engine is None:
+            engine = DEFAULT_ENGINE
+        if isinstance(engine, str):
+            engine = {"classifiers": engine, "stats": engine}
+        engine = {**DEFAULT_ENGINE, **engine}
+        for family, name in engine.items():
+            if family not in DEFAULT_ENGINE:
+                raise ValueError(f"Familie de ținte necunoscută: {family}")
+            if name not in ENGINES:
+                raise ValueError(f"Engine necunoscut: {name}")
+        return engine
+
+    def train_models(self, n_jobs=1, stat_mode="per_target", engine=None):
+        """
+        Antrenează modelele pe aceeași matrice și același split train/test.
+        n_jobs > 1 (sau -1 pentru toate nucleele) distribuie modelele independente pe procese
+        separate; rezultatele sunt identice cu rularea serială. stat_mode="multi_output"
+        înlocuiește cele 18 regresoare de statistici cu un singur model multi-output ("stats").
+        engine alege estimatorul din ENGINES, global sau per familie de ținte (vezi resolve_engine).
+        """
+        if stat_mode not in ("per_target", "multi_output"):
+            raise ValueError(f"stat_mode necunoscut: {stat_mode}")
+        self.engine = self.resolve_engine(engine)
+        self.stat_mode = stat_mode
+        make_classifier = ENGINES[self.engine["classifiers"]]["classifier"]
+        make_regressor = ENGINES[self.engine["stats"]]["regressor"]
+
+        self.models = {target: make_classifier() for target in self.CLASSIFIER_TARGETS}
+        if stat_mode == "multi_output":
+            regressor = make_regressor()
+            if self.engine["stats"] != "random_forest":
+                # doar pădurile aleatoare suportă nativ mai multe ținte
+                regressor = MultiOutputRegressor(regressor)
+            # țintele sunt standardizate ca fiecare statistică să conteze la fel în criteriul de split
+            self.models['stats'] = TransformedTargetRegressor(regressor=regressor, transformer=StandardScaler())
+        else:
+            for model_key in self.stat_model_keys:
+                self.models[model_key] = make_regressor()
 
-        for target in stat_targets:
-            for team_type in ['home', 'away']:
+        X_train, X_test, train_idx, test_idx = self._shared_split(0.3)
 
-                X, y = self.prepare_data(target, team_type)
-                X_train, X_test, y_train, y_test = train_test_split(
-                    X, y, test_size=0.3, random_state=42)
+        # toate modelele de statistici folosesc aceleași feature-uri, deci același scaler
+        scaler = StandardScaler()
+        X_train_scaled = scaler.fit_transform(X_train)
+        X_test_scaled = scaler.transform(X_test)
 
-                scaler = StandardScaler()
-                X_train_scaled = scaler.fit_transform(X_train)
-                X_test_scaled = scaler.transform(X_test)
+        tasks = []
+        for target_name in self.CLASSIFIER_TARGETS:
+            _, y = self.prepare_data(target_name)
+            tasks.append((target_name, X_train, X_test, y[train_idx], y[test_idx], False))
 
-                model_key = f"{target}_{team_type}"
-                self.models[model_key].fit(X_train_scaled, y_train)
-                y_pred = self.models[model_key].predict(X_test_scaled)
+        if stat_mode == "multi_output":
+            Y = np.column_stack([self.prepare_data(target, team_type)[1]
+                                 for target in self.STAT_TARGETS for team_type in ['home', 'away']])
+            tasks.append(('stats', X_train_scaled, X_test_scaled, Y[train_idx], Y[test_idx], True))
+        else:
+            for target in self.STAT_TARGETS:
+                for team_type in ['home', 'away']:
+                    _, y = self.prepare_data(target, team_type)
+                    tasks.append((f"{target}_{team_type}", X_train_scaled, X_test_scaled,
+                                  y[train_idx], y[test_idx], True))
 
-                mae = mean_absolute_error(y_test, y_pred)
-                r2 = r2_score(y_test, y_pred)
-                results[model_key] = {'mae': mae, 'r2': r2}
+        fitted = Parallel(n_jobs=n_jobs)(
+            delayed(_fit_and_score)(model_key, self.models[model_key], X_tr, X_te, y_train, y_test, regression)
+            for model_key, X_tr, X_te, y_train, y_test, regression in tasks)
 
+        results = {}
+        self.scalers = {}
+        self.trained_keys = self._row_keys()
+        self.updates_since_rebuild = 0
+        self._models_changed()
+        for model_key, model, metrics in fitted:
+            self.models[model_key] = model
+            if model_key == 'stats':
+                self.scalers['stats'] = scaler
+                for i, stat_key in enumerate(self.stat_model_keys):
+                    results[stat_key] = {name: float(values[i]) for name, values in metrics.items()}
+                continue
+            if model_key not in self.CLASSIFIER_TARGETS:
                 self.scalers[model_key] = scaler
+            results[model_key] = metrics
         return results
 
+    def predict_stats(self, X):
+        """
+        Toate statisticile pentru rândurile din X (nescalate), ca dict model_key -> array.
+        În modul multi-output e un singur apel predict pentru toate cele 18 ținte.
+        """
+        if 'stats' in self.models:
+            Y = self.models['stats'].predict(self.scalers['stats'].transform(X))
+            return {stat_key: Y[:, i] for i, stat_key in enumerate(self.stat_model_keys)}
+
+        predictions = {}
+        scaled = {}
+        for stat_key in self.stat_model_keys:
+            if stat_key not in self.models:
+                continue
+            scaler = self.scalers[stat_key]
+            if id(scaler) not in scaled:
+                scaled[id(scaler)] = scaler.transform(X)
+            predictions[stat_key] = self.models[stat_key].predict(scaled[id(scaler)])
+        return predictions
+
     def test_all_models_and_save(self, test_size=0.3, csv_path="all_predictions.csv"):
         """
         Testează toate modelele și salvează rezultatele într-un CSV cu coloanele originale
@@ -177,48 +541,107 @@ class FootballMatchPredictor:
         """
 
         df_results = self.df.copy()
+        _, X_test, _, test_idx = self._shared_split(test_size)
+        match_indices = self.df.index[test_idx]
 
         # Clasificare și regresie principale
-        for target_name in ['outcome', 'goals', 'score']:
-            X, y = self.prepare_data(target_name)
-            X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size, random_state=42)
-
+        for target_name in self.CLASSIFIER_TARGETS:
             y_pred = self.models[target_name].predict(X_test)
 
             # Salvează predicțiile în dataframe-ul final
-            match_indices = y_test.index
             df_results.loc[match_indices, f"Predicted_{target_name}"] = y_pred
 
         # Modele statistici LSTM / RandomForest pentru fiecare echipă
-        stat_targets = ['corners', 'shots_on_target', 'possession', 'yellow_cards',
-                        'fouls', 'tackles', 'passes', 'shots_total', 'xg']
-
-        for target in stat_targets:
-            for team_type in ['home', 'away']:
-                model_key = f"{target}_{team_type}"
-                if model_key not in self.models:
-                    continue
-
-                X, y = self.prepare_data(target, team_type)
-                X_train, X_test, y_train, y_test = train_test_split(
-                    X, y, test_size=test_size, random_state=42
-                )
-
-                scaler = self.scalers[model_key]
-                X_test_scaled = scaler.transform(X_test)
-
-                y_pred = self.models[model_key].predict(X_test_scaled)
-
-                # Salvează predicțiile
-                match_indices = y_test.index
-                df_results.loc[match_indices, f"Predicted_{target}_{team_type}"] = y_pred
+        for stat_key, y_pred in self.predict_stats(X_test).items():
+            df_results.loc[match_indices, f"Predicted_{stat_key}"] = y_pred
 
         df_results.to_csv(csv_path, index=False)
 
         return df_results
 
-    def predict_future_match(self, home_team, away_team):
+    def walk_forward_folds(self, n_folds=10, min_train_fraction=0.3):
+        """
+        Fold-uri walk-forward pe dată: fiecare fold testează o fereastră de meciuri și antrenează doar pe
+        meciurile dinaintea ei (fereastră de antrenare extinsă). Meciurile fără dată rămân doar în antrenare.
+        Întoarce o listă de (train_idx, test_idx, început, sfârșit), indici poziționali în feature_matrix().
+        """
+        dates = pd.to_datetime(self.df["Date"], errors='coerce').to_numpy()
+        dated = np.flatnonzero(~pd.isna(dates))
+        order = dated[np.argsort(dates[dated], kind="stable")]
+        undated = np.flatnonzero(pd.isna(dates))
+
+        start = int(len(order) * min_train_fraction)
+        bounds = np.linspace(start, len(order), n_folds + 1).astype(int)
+        folds = []
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            if hi <= lo:
+                continue
+            # meciurile din aceeași zi cu începutul ferestrei nu intră în antrenare
+            first_day = dates[order[lo]]
+            train_idx = np.concatenate([undated, order[:lo][dates[order[:lo]] < first_day]])
+            folds.append((np.sort(train_idx), np.sort(order[lo:hi]),
+                          pd.Timestamp(first_day).date(), pd.Timestamp(dates[order[hi - 1]]).date()))
+        return folds
+
+    def backtest(self, n_folds=10, min_train_fraction=0.3, n_jobs=-1, engine=None,
+                 csv_path="processed/backtest_metrics.csv"):
+        """
+        Backtest walk-forward pentru toate țintele. Fiecare pereche (fold, model) rulează în procese
+        worker separate; matricea de feature-uri e construită o singură dată și partajată de toate fold-urile.
+        Scrie și întoarce metricile per fold și per țintă.
+        """
+        engine = self.resolve_engine(engine)
+        make_classifier = ENGINES[engine["classifiers"]]["classifier"]
+        make_regressor = ENGINES[engine["stats"]]["regressor"]
+        X = self.feature_matrix()
+        folds = self.walk_forward_folds(n_folds, min_train_fraction)
+
+        targets = {key: (self.prepare_data(key)[1], False) for key in self.CLASSIFIER_TARGETS}
+        for target in self.STAT_TARGETS:
+            for team_type in ['home', 'away']:
+                targets[f"{target}_{team_type}"] = (self.prepare_data(target, team_type)[1], True)
+
+        # fără StandardScaler: pădurile și boosting-ul pe histograme nu depind de scala feature-urilor
+        fitted = Parallel(n_jobs=n_jobs)(
+            delayed(_backtest_fold)(fold, model_key, make_regressor() if regression else make_classifier(),
+                                    X, y, train_idx, test_idx, regression)
+            for fold, (train_idx, test_idx, _, _) in enumerate(folds)
+            for model_key, (y, regression) in targets.items())
+
+        rows = []
+        for fold, model_key, metrics in fitted:
+            train_idx, test_idx, first_day, last_day = folds[fold]
+            rows.append({"Fold": fold, "Test_Start": first_day, "Test_End": last_day,
+                         "Train_Size": len(train_idx), "Test_Size": len(test_idx),
+                         "Target": model_key, **metrics})
+        metrics = pd.DataFrame(rows)
+
+        if csv_path:
+            os.makedirs(os.path.dirname(csv_path) or ".", exist_ok=True)
+            metrics.to_csv(csv_path, index=False)
+        return metrics
+
+    def _models_changed(self):
+        self.model_version += 1
+        self.prediction_cache.clear()
 
+    def predict_future_match(self, home_team, away_team):
+        """
+        Predicția pentru un meci; rezultatele se păstrează în prediction_cache, cu cheia
+        (gazde, oaspeți, versiunea modelelor, amprenta datelor). Rezultatul întors nu trebuie modificat.
+        """
+        key = (home_team, away_team, self.model_version, self.fingerprint)
+        prediction = self.prediction_cache.get(key)
+        if prediction is None:
+            prediction = self._predict_match(home_team, away_team)
+            if prediction is None:
+                return None
+            self.prediction_cache.put(key, prediction)
+
+        self._save_prediction_to_csv(home_team, away_team, prediction)
+        return prediction
+
+    def _predict_match(self, home_team, away_team):
         if home_team not in self.team_encoder.classes_ or away_team not in self.team_encoder.classes_:
             print("Una dintre echipe nu există în dataset.")
             return None
@@ -242,25 +665,17 @@ class FootballMatchPredictor:
 
         pred_goals = self.models['goals'].predict(X_new_home)[0]
         pred_score = self.models['score'].predict(X_new_home)[0]
-        stat_targets = ['corners', 'shots_on_target', 'possession', 'yellow_cards',
-                        'fouls', 'tackles', 'passes', 'shots_total', 'xg']
 
-        for target in stat_targets:
+        # rândul 0: perspectiva gazdei, rândul 1: perspectiva oaspeților
+        stat_predictions = self.predict_stats(np.vstack([X_new_home, X_new_away]))
+        for target in self.STAT_TARGETS:
             home_key = f"{target}_home"
-            if home_key in self.models:
-                X_scaled = self.scalers[home_key].transform(X_new_home)
-                predictions['home'][target] = self.models[home_key].predict(X_scaled)[0]
+            if home_key in stat_predictions:
+                predictions['home'][target] = stat_predictions[home_key][0]
 
             away_key = f"{target}_away"
-            if away_key in self.models:
-                X_scaled = self.scalers[away_key].transform(X_new_away)
-                predictions['away'][target] = self.models[away_key].predict(X_scaled)[0]
-
-        self._save_prediction_to_csv(home_team, away_team, {
-            'outcome': (pred_outcome, proba_outcome),
-            'goals': pred_goals,
-            'score': pred_score,
-            'stats': predictions})
+            if away_key in stat_predictions:
+                predictions['away'][target] = stat_predictions[away_key][1]
 
         return {
             'outcome': (pred_outcome, proba_outcome),
@@ -268,12 +683,145 @@ class FootballMatchPredictor:
             'score': pred_score,
             'stats': predictions}
 
+    def _pair_keys(self, team_ids, opponent_ids):
+        team_ids = np.asarray(team_ids, dtype=np.int64)
+        opponent_ids = np.asarray(opponent_ids, dtype=np.int64)
+        return np.minimum(team_ids, opponent_ids) * len(self.team_encoder.classes_) + \
+            np.maximum(team_ids, opponent_ids)
+
+    def h2h_index(self):
+        """Media h2h_win_rate pentru fiecare pereche neordonată de echipe, calculată într-un singur groupby."""
+        if self._h2h is None:
+            keys = self._pair_keys(self.df["Team_encoded"], self.df["Opponent_encoded"])
+            self._h2h = self.df["h2h_win_rate"].groupby(keys).mean()
+            self._h2h_rates = self._h2h.to_dict()
+        return self._h2h
+
+    def h2h_win_rates(self, teams, opponents, default=0.5):
+        """h2h_win_rate pentru mai multe perechi deodată; perechile fără meciuri directe primesc valoarea implicită."""
+        self.team_index()
+        team_ids = pd.Series(teams).map(self._team_ids)
+        opponent_ids = pd.Series(opponents).map(self._team_ids)
+        known = team_ids.notna() & opponent_ids.notna()
+        rates = np.full(len(team_ids), default, dtype=np.float64)
+        keys = self._pair_keys(team_ids[known].astype(np.int64), opponent_ids[known].astype(np.int64))
+        rates[known.to_numpy()] = self.h2h_index().reindex(keys).fillna(default).to_numpy()
+        return rates
+
+    def _h2h_win_rate(self, team_name, opponent_name, default=0.5):
+        self.team_index()
+        team_id, opponent_id = self._team_ids.get(team_name), self._team_ids.get(opponent_name)
+        if team_id is None or opponent_id is None:
+            return default
+        self.h2h_index()
+        key = min(team_id, opponent_id) * len(self.team_encoder.classes_) + max(team_id, opponent_id)
+        rate = self._h2h_rates.get(key, default)
+        return default if rate != rate else rate
+
+    @staticmethod
+    def load_fixtures(pattern="processed/fixtures-*.json"):
+        """Toate meciurile viitoare din fișierele fixtures-*.json, cu liga luată din numele fișierului."""
+        rows = []
+        for path in sorted(glob(pattern)):
+            league = os.path.basename(path)[len("fixtures-"):-len(".json")]
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            for match in data.get("matches", []) if isinstance(data, dict) else data:
+                rows.append({"League": league, "Date": match.get("date", ""), "Time": match.get("time", ""),
+                             "Home_Team": match.get("home"), "Away_Team": match.get("away")})
+        return pd.DataFrame(rows, columns=["League", "Date", "Time", "Home_Team", "Away_Team"])
+
+    def predict_fixtures(self, pairs=None, csv_path=None):
+        """
+        Predicții pentru o listă de meciuri: perechi (gazde, oaspeți), un DataFrame cu coloanele
+        Home_Team/Away_Team sau, implicit, toate meciurile din processed/fixtures-*.json.
+        Construiește o singură matrice de feature-uri și rulează fiecare model o singură dată.
+        """
+        if pairs is None:
+            fixtures = self.load_fixtures()
+        elif isinstance(pairs, pd.DataFrame):
+            fixtures = pairs.reset_index(drop=True)
+        else:
+            fixtures = pd.DataFrame(list(pairs), columns=["Home_Team", "Away_Team"])
+
+        # aceeași regulă ca _get_team_stats: o echipă care apare doar ca adversar nu are rând în team_index
+        known = set(self.team_index()["Team"])
+        valid = fixtures["Home_Team"].isin(known) & fixtures["Away_Team"].isin(known)
+        if not valid.all():
+            print(f"{int((~valid).sum())} meciuri ignorate: echipe fără meciuri proprii în dataset")
+        fixtures = fixtures[valid].reset_index(drop=True)
+        if fixtures.empty:
+            return fixtures
+
+        home_teams = fixtures["Home_Team"].to_numpy()
+        away_teams = fixtures["Away_Team"].to_numpy()
+        X_home = self._batch_prediction_features(home_teams, away_teams, 'home')
+        X_away = self._batch_prediction_features(away_teams, home_teams, 'away')
+
+        results = fixtures.copy()
+        outcome_model = self.models['outcome']
+        proba = outcome_model.predict_proba(X_home)
+        results["Predicted_Outcome"] = outcome_model.classes_[proba.argmax(axis=1)]
+        proba_columns = {0: "Proba_Draw", 1: "Proba_Home_Win", 2: "Proba_Away_Win"}
+        for i, outcome_class in enumerate(outcome_model.classes_):
+            results[proba_columns.get(outcome_class, f"Proba_{outcome_class}")] = proba[:, i]
+        results["Predicted_Goals"] = self.models['goals'].predict(X_home)
+        results["Predicted_Score"] = self.models['score'].predict(X_home)
+
+        # primele len(fixtures) rânduri: perspectiva gazdelor, restul: perspectiva oaspeților
+        stat_predictions = self.predict_stats(np.vstack([X_home, X_away]))
+        for target in self.STAT_TARGETS:
+            if f"{target}_home" in stat_predictions:
+                results[f"{target}_home"] = stat_predictions[f"{target}_home"][:len(fixtures)]
+            if f"{target}_away" in stat_predictions:
+                results[f"{target}_away"] = stat_predictions[f"{target}_away"][len(fixtures):]
+
+        if csv_path:
+            results.to_csv(csv_path, index=False, encoding="utf-8-sig")
+        return results
+
+    def _batch_prediction_features(self, teams, opponents, perspective):
+        """Echivalentul vectorizat al _prepare_prediction_features pentru mai multe meciuri."""
+        latest = self.team_index().set_index("Team")
+        team = latest.reindex(teams)
+        opponent = latest.reindex(opponents)
+
+        def column(frame, name, default):
+            return frame[name].to_numpy() if name in frame.columns else np.full(len(frame), default)
+
+        home_side, away_side = (team, opponent) if perspective == 'home' else (opponent, team)
+        features = {
+            'win_rate_global': column(team, 'win_rate_global', 0.5),
+            'win_rate_lastN': column(team, 'win_rate_lastN', 0.5),
+            'home_win_rate': column(home_side, 'home_win_rate', 0.5),
+            'away_win_rate': column(away_side, 'away_win_rate', 0.5),
+            'Home_encoded': np.full(len(teams), 1 if perspective == 'home' else 0),
+            'h2h_win_rate': self.h2h_win_rates(teams, opponents),
+            'form_score': column(team, 'form_score', 0.5),
+            'goal_diff_win_rate': column(team, 'goal_diff_win_rate', 0),
+            'weighted_outcome': column(team, 'weighted_outcome', 0.5),
+            'team_goals': column(team, 'team_goals', 1),
+            'opponent_goals': column(opponent, 'team_goals', 1),
+            'Rank': column(team, 'Rank', 10),
+            'opponent_rank': column(opponent, 'Rank', 10)}
+
+        for stat_feature in self.stat_features:
+            if perspective == 'home':
+                source = stat_feature
+            else:
+                source = stat_feature.replace('_team', '_opponent') \
+                    if '_team' in stat_feature else stat_feature.replace('_opponent', '_team')
+            features[stat_feature] = column(team, source, 0)
+
+        available_features = [f for f in self.all_features if f in self.df.columns]
+        return np.column_stack([np.asarray(features[f], dtype=np.float32) for f in available_features])
+
     def _get_team_stats(self, team_name):
-        team_matches = self.df[self.df["Team"] == team_name]
-        if team_matches.empty:
+        self.team_index()
+        team_id = self._team_ids.get(team_name)
+        if team_id is None:
             return None
-
-        return team_matches.iloc[-1].to_dict()
+        return self._latest_rows.get(team_id)
 
     def _prepare_prediction_features(self, team_stats, opponent_stats, team_name, opponent_name, perspective):
         try:
@@ -291,10 +839,7 @@ class FootballMatchPredictor:
                 features['away_win_rate'] = team_stats.get('away_win_rate', 0.5)
                 features['Home_encoded'] = 0
 
-            h2h_matches = self.df[
-                ((self.df["Team"] == team_name) & (self.df["Opponent"] == opponent_name)) |
-                ((self.df["Team"] == opponent_name) & (self.df["Opponent"] == team_name))]
-            features['h2h_win_rate'] = h2h_matches['h2h_win_rate'].mean() if not h2h_matches.empty else 0.5
+            features['h2h_win_rate'] = self._h2h_win_rate(team_name, opponent_name)
             features['form_score'] = team_stats.get('form_score', 0.5)
             features['goal_diff_win_rate'] = team_stats.get('goal_diff_win_rate', 0)
             features['weighted_outcome'] = team_stats.get('weighted_outcome', 0.5)
@@ -315,9 +860,7 @@ class FootballMatchPredictor:
             X_new = pd.DataFrame([features])
 
             available_features = [f for f in self.all_features if f in self.df.columns]
-            X_new = X_new[available_features]
-
-            return X_new
+            return X_new[available_features].to_numpy(dtype=np.float32)
 
         except Exception as e:
             return None
@@ -340,7 +883,4 @@ class FootballMatchPredictor:
             for stat, val in predictions["stats"][side].items():
                 row[f"{stat}_{side}"] = round(val, 2)
 
-        df_row = pd.DataFrame([row])
-
-        file_exists = os.path.isfile(filename)
-        df_row.to_csv(filename, mode="a", header=not file_exists, index=False, encoding="utf-8-sig")
\ No newline at end of file
+        get_prediction_logger(filename).log(row)
\ No newline at end of file
@@ -1,3 +1,6 @@
+import json
+import os
+
 import pandas as pd
 import numpy as np
 
@@ -6,6 +9,13 @@ class MatchPreprocessor:
         self.csv_file = csv_file
         self.df = None
         self.zero_threshold = zero_threshold
+        self.goals_malformed = 0
+        # parametrii învățați de fit(): coloanele eliminate și scala fiecărei coloane normalizate
+        self.params = None
+
+    @staticmethod
+    def params_path(csv_file):
+        return os.path.splitext(csv_file)[0] + ".params.json"
 
     def load_csv(self):
         self.df = pd.read_csv(self.csv_file)
@@ -15,39 +25,174 @@ class MatchPreprocessor:
         self.df.fillna(value, inplace=True)
         return self
 
+    @staticmethod
+    def _to_numeric(series):
+        s = series.astype(str)
+        if s.str.contains('%').any():
+            return s.str.extract(r'(\d+\.?\d*)')[0].astype(float) / 100
+        return pd.to_numeric(s.str.replace(r'[^0-9.-]', '', regex=True), errors='coerce').fillna(0)
+
+    @staticmethod
+    def _split_goals(goals):
+        """
+        Împarte coloana Goals în goluri home/away. Acceptă forma "H:A" (cu semne și spații) și forma
+        împachetată ca întreg (primele două cifre home, restul away). Valorile care nu pot fi citite
+        devin NaN și sunt numărate în loc să oprească procesarea.
+        """
+        goals = goals.astype(str)
+        # o singură trecere: grupurile 0-1 prind forma "H:A", grupurile 2-3 forma împachetată
+        parts = goals.str.extract(r"^\s*(?:([+-]?\d+)\s*:\s*([+-]?\d+)\s*(?::|$)|\+?0*([1-9]\d)(\d+)\s*$)")
+        home_away = pd.DataFrame({
+            "team_total_goals_home": pd.to_numeric(parts[0].fillna(parts[2]), errors="coerce"),
+            "team_total_goals_away": pd.to_numeric(parts[1].fillna(parts[3]), errors="coerce")},
+            index=goals.index)
+        malformed = int(home_away.isna().any(axis=1).sum())
+        if malformed:
+            print(f"'Goals': {malformed} valori care nu au putut fi citite au devenit NaN")
+        else:
+            home_away = home_away.astype(np.int64)
+        return home_away, malformed
+
+    @staticmethod
+    def _downcast(series):
+        if pd.api.types.is_bool_dtype(series) or not pd.api.types.is_numeric_dtype(series):
+            return series.astype("category")
+        values = series.to_numpy()
+        if np.isfinite(values).all() and (values == np.round(values)).all():
+            if values.size == 0 or (values.min() >= np.iinfo(np.int16).min and values.max() <= np.iinfo(np.int16).max):
+                return series.astype(np.int16)
+            return series.astype(np.int32 if np.abs(values).max() <= np.iinfo(np.int32).max else np.int64)
+        return series.astype(np.float32)
+
     def convert_numeric_and_percentage(self):
         for col in self.df.columns:
-            s = self.df[col].astype(str)
-
-            if s.str.contains('%').any():
-                self.df[col] = s.str.extract(r'(\d+\.?\d*)')[0].astype(float) / 100
-            else:
-                self.df[col] = pd.to_numeric(s.str.replace(r'[^0-9.-]', '', regex=True), errors='coerce').fillna(0)
+            # "H:A" rămâne text pentru split_goals_column; convertit la număr ar pierde separatorul
+            if col == "Goals":
+                continue
+            self.df[col] = self._to_numeric(self.df[col])
         return self
 
     def split_goals_column(self):
         if "Goals" in self.df.columns:
-            goals = self.df["Goals"].astype(str)
-            home_away = goals.apply(lambda x: pd.Series([
-                int(x.split(":")[0]) if ":" in x else int(str(int(x))[:2]),
-                int(x.split(":")[1]) if ":" in x else int(str(int(x))[2:])]))
-            home_away.columns = ["team_total_goals_home", "team_total_goals_away"]
+            home_away, self.goals_malformed = self._split_goals(self.df["Goals"])
             self.df = pd.concat([self.df.drop(columns=["Goals"]), home_away], axis=1)
             print("'Goals' a fost împărțit în home/away și eliminată coloana originală")
         return self
 
-    def drop_zero_heavy_columns(self):
+    def fit_zero_heavy_columns(self):
         zero_fraction = (self.df == 0).mean()
-        cols_to_drop = zero_fraction[zero_fraction > self.zero_threshold].index.tolist()
+        if self.params is None:
+            self.params = {}
+        self.params["dropped_columns"] = zero_fraction[zero_fraction > self.zero_threshold].index.tolist()
+        return self
+
+    def fit_large_stats(self, threshold=100):
+        if self.params is None:
+            self.params = {}
+        dropped = set(self.params.get("dropped_columns", []))
+        scales = {}
+        for col in self.df.select_dtypes(include=[np.number]).columns:
+            if col in dropped:
+                continue
+            col_max = self.df[col].max()
+            if col_max > threshold:
+                scales[col] = float(col_max + 1e-6)
+        self.params["scales"] = scales
+        return self
+
+    def fit(self, threshold=100):
+        return self.fit_zero_heavy_columns().fit_large_stats(threshold)
+
+    def transform_frame(self, df):
+        """Aplică parametrii salvați pe un DataFrame nou (meciuri noi, rânduri de predicție)."""
+        dropped = [col for col in self.params.get("dropped_columns", []) if col in df.columns]
+        df = df.drop(columns=dropped)
+        for col, scale in self.params.get("scales", {}).items():
+            if col in df.columns:
+                df[col] = df[col] / scale
+        return df
+
+    def transform(self):
+        self.df = self.transform_frame(self.df)
+        return self
+
+    def drop_zero_heavy_columns(self):
+        if self.params is None or "dropped_columns" not in self.params:
+            self.fit_zero_heavy_columns()
+        cols_to_drop = [col for col in self.params["dropped_columns"] if col in self.df.columns]
         if cols_to_drop:
             print(f"Eliminăm coloanele cu >{self.zero_threshold*100:.0f}% valori zero: {cols_to_drop}")
             self.df.drop(columns=cols_to_drop, inplace=True)
         return self
 
     def normalize_large_stats(self, threshold=100):
-        for col in self.df.select_dtypes(include=[np.number]).columns:
-            if self.df[col].max() > threshold:
-                self.df[col] = self.df[col] / (self.df[col].max() + 1e-6)
+        if self.params is None or "scales" not in self.params:
+            self.fit_large_stats(threshold)
+        for col, scale in self.params["scales"].items():
+            if col in self.df.columns:
+                self.df[col] = self.df[col] / scale
+        return self
+
+    def save_params(self, params_file):
+        if self.params is None:
+            raise ValueError("Parametrii nu au fost calculați. Apelează fit() mai întâi.")
+        with open(params_file, "w", encoding="utf-8") as f:
+            json.dump(self.params, f, ensure_ascii=False, indent=4)
+        return self
+
+    def load_params(self, params_file):
+        with open(params_file, "r", encoding="utf-8") as f:
+            self.params = json.load(f)
+        return self
+
+    def run(self, fill_value=0, threshold=100, downcast=True):
+        """
+        Varianta fuzionată a lanțului fill_missing -> convert_numeric_and_percentage ->
+        split_goals_column -> drop_zero_heavy_columns -> normalize_large_stats: fiecare coloană
+        e procesată o singură dată. Cu downcast=True coloanele sunt reduse în memorie la
+        int16/float32. Dacă parametrii au fost încărcați cu load_params(), sunt aplicați
+        în loc să fie recalculați.
+        """
+        if self.df is None:
+            self.load_csv()
+
+        columns = {}
+        goals = None
+        for col in self.df.columns:
+            s = self.df[col].fillna(fill_value)
+            if col == "Goals":
+                goals, self.goals_malformed = self._split_goals(s)
+                continue
+            # coloanele deja numerice nu mai trec prin conversia la text
+            columns[col] = s if pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s) \
+                else self._to_numeric(s)
+        if goals is not None:
+            columns.update(goals.items())
+            print("'Goals' a fost împărțit în home/away și eliminată coloana originală")
+
+        if self.params is not None:
+            # parametrii încărcați se aplică la fel ca pe orice rânduri noi
+            frame = self.transform_frame(pd.DataFrame(columns, index=self.df.index))
+            self.df = frame.apply(self._downcast) if downcast else frame
+            return self
+
+        self.params = {"dropped_columns": [], "scales": {}}
+        scales = self.params["scales"]
+        kept = {}
+        for col, s in columns.items():
+            if (s == 0).mean() > self.zero_threshold:
+                self.params["dropped_columns"].append(col)
+                continue
+            col_max = s.max()
+            if col_max > threshold:
+                scales[col] = float(col_max + 1e-6)
+                s = s / scales[col]
+            kept[col] = self._downcast(s) if downcast else s
+        if self.params["dropped_columns"]:
+            print(f"Eliminăm coloanele cu >{self.zero_threshold*100:.0f}% valori zero: "
+                  f"{self.params['dropped_columns']}")
+
+        self.df = pd.DataFrame(kept, index=self.df.index)
         return self
 
     def get_df(self):
@@ -56,4 +201,6 @@ class MatchPreprocessor:
     def save_csv(self, output_file):
         self.df.to_csv(output_file, index=False)
         print(f"CSV curățat salvat: '{output_file}'")
+        if self.params is not None:
+            self.save_params(self.params_path(output_file))
         return self
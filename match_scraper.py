@@ -1,11 +1,142 @@
+import asyncio
 import time
+from urllib.parse import urlparse
 
+from playwright.async_api import async_playwright
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
 from playwright.sync_api import sync_playwright
 
+from resource_blocker import ResourceBlocker
+
+
+# --- Extragere bulk: un singur page.evaluate per tab, cu aceleași selectoare ca varianta cu locatori ---
+HEADER_SCRIPT = """
+() => {
+    const text = el => el ? el.innerText.trim() : "";
+    const container = document.querySelector(".duelParticipant__container");
+    if (!container) throw new Error("Lipsește .duelParticipant__container");
+    const home = container.querySelector(".duelParticipant__home .participant__participantName a");
+    const away = container.querySelector(".duelParticipant__away .participant__participantName a");
+    if (!home || !away) throw new Error("Lipsesc numele echipelor");
+    const spans = container.querySelectorAll(".duelParticipant__score .detailScore__wrapper span");
+    const status = container.querySelector(".detailScore__status span")
+        || document.querySelector(".fixedHeaderDuel__detailStatus");
+    return {
+        date_time: text(container.querySelector(".duelParticipant__startTime div")),
+        home: home.innerText,
+        away: away.innerText,
+        home_goals: spans.length >= 3 ? spans[0].innerText : "",
+        away_goals: spans.length >= 3 ? spans[2].innerText : "",
+        status: status ? status.innerText : ""
+    };
+}
+"""
+
+SUMMARY_SCRIPT = """
+() => Array.from(document.querySelectorAll(".smv__participantRow")).map(row => {
+    const timeBox = row.querySelector(".smv__timeBox");
+    const player = row.querySelector(".smv__playerName div, .smv__playerName");
+    const incident = row.querySelector("div[title]");
+    return {
+        minute: timeBox ? timeBox.innerText.trim() : "",
+        player: player ? player.innerText.trim() : "",
+        incident: incident ? incident.getAttribute("title").trim() : ""
+    };
+})
+"""
+
+STATISTICS_SCRIPT = """
+() => Array.from(document.querySelectorAll("div[data-testid='wcl-statistics']")).flatMap(block => {
+    const category = block.querySelector("div[data-testid='wcl-statistics-category']");
+    const values = block.querySelectorAll("div[data-testid='wcl-statistics-value']");
+    if (values.length < 2) return [];
+    return [{
+        label: category ? category.innerText.trim() : "",
+        home_value: values[0].innerText.trim(),
+        away_value: values[1].innerText.trim()
+    }];
+})
+"""
+
+LINEUPS_SCRIPT = """
+() => {
+    // echivalentul lui :has-text() din Playwright: subșir, fără diferență între litere mari și mici
+    const headers = label => Array.from(
+        document.querySelectorAll("div[data-testid='wcl-headerSection-text']")).filter(
+        el => el.textContent.replace(/\\s+/g, " ").toLowerCase().includes(label.toLowerCase()));
+    const nextDiv = el => {
+        let sibling = el.nextElementSibling;
+        while (sibling && sibling.tagName !== "DIV") sibling = sibling.nextElementSibling;
+        return sibling;
+    };
+    const participantName = (p, fallbackToImage) => {
+        const inner = p.querySelector("div[data-testid^='wcl-lineupsParticipantGeneral']");
+        if (inner) {
+            const strong = p.querySelector("div[data-testid^='wcl-lineupsParticipantGeneral'] button strong");
+            return (strong || inner).innerText.trim();
+        }
+        const image = fallbackToImage ? p.querySelector("button img") : null;
+        return image ? image.getAttribute("alt").trim() : p.innerText.trim();
+    };
+    const section = (label, single) => {
+        const players = single ? {home_team: "", away_team: ""} : {home_team: [], away_team: []};
+        try {
+            for (const header of headers(label)) {
+                const container = nextDiv(header);
+                if (!container) continue;
+                for (const p of container.querySelectorAll("div.lf__participantNew")) {
+                    const name = participantName(p, !single);
+                    const key = (p.getAttribute("class") || "").includes("lf__isReversed") ? "away_team" : "home_team";
+                    if (single) players[key] = name; else players[key].push(name);
+                }
+            }
+        } catch (e) {}
+        return players;
+    };
+    const formation = {home_team: "", away_team: ""};
+    try {
+        const spans = headers("Formation").flatMap(el => Array.from(el.querySelectorAll("span")));
+        if (spans.length >= 3) {
+            formation.home_team = spans[0].innerText.trim();
+            formation.away_team = spans[2].innerText.trim();
+        }
+    } catch (e) {}
+    return {
+        formation: formation,
+        starting_lineups: section("Starting Lineups", false),
+        substitutes: section("Substitutes", false),
+        substituted_players: section("Substituted players", false),
+        missing_players: section("Missing Players", false),
+        coaches: section("Coaches", true)
+    };
+}
+"""
+
+
+def match_detail_from_header(header):
+    """MatchDetail din rezultatul lui HEADER_SCRIPT (fără summary/statistics/lineups)."""
+    date_time = header["date_time"]
+    date_part, time_part = (date_time.split(" ", 1) if " " in date_time else (date_time, ""))
+    return MatchDetail(date_part, time_part, header["home"], header["away"],
+                       header["home_goals"], header["away_goals"], header["status"])
+
+
+def page_metrics(match_url, started, load_seconds, blocker=None, snapshot=None):
+    """Timpul de încărcare și, dacă blocarea resurselor e activă, octeții și cererile blocate pentru un meci."""
+    metrics = {"url": match_url, "load_ms": round(load_seconds * 1000),
+               "total_ms": round((time.perf_counter() - started) * 1000)}
+    if blocker is not None:
+        metrics.update(blocker.since(snapshot))
+    print(f"   {match_url}: încărcare {metrics['load_ms']} ms, total {metrics['total_ms']} ms"
+          + (f", {metrics['bytes'] / 1024:.0f} KiB, {metrics['blocked']} cereri blocate"
+             if blocker is not None else ""))
+    return metrics
+
 
 class MatchDetail:
     def __init__(self, date, time_txt, home, away, home_goals, away_goals, status,
-                 summary=None, statistics=None, lineups=None):
+                 summary=None, statistics=None, lineups=None, match_id=None):
+        self.match_id = match_id
         self.date = date
         self.time_txt = time_txt
         self.home = home
@@ -18,7 +149,9 @@ class MatchDetail:
         self.lineups = lineups or {}
 
     def to_dict(self):
+        data = {"id": self.match_id} if self.match_id else {}
         return {
+            **data,
             "date": self.date,
             "time": self.time_txt,
             "home": self.home,
@@ -32,19 +165,56 @@ class MatchDetail:
         }
 
 class MatchScraper:
-    def __init__(self, matches_url, headless=True):
+    # statusurile după care un meci nu se mai schimbă și nu mai trebuie extras din nou
+    FINISHED_STATUSES = {"FINISHED", "AFTER PENALTIES", "AFTER EXTRA TIME", "AWARDED"}
+
+    def __init__(self, matches_url, headless=True, block_resources=None, slow_mo=0, bulk_extract=False):
         self.BASE_URL = matches_url
         self.headless = headless
+        self.slow_mo = slow_mo
+        # bulk_extract: un singur page.evaluate per tab în loc de câte un apel de locator pentru fiecare rând;
+        # paritatea cu locatorii e verificată în tests/test_match_scraper.py pe paginile din tests/fixtures
+        self.bulk_extract = bulk_extract
+        # blocarea resurselor grele e activă implicit doar în modul headless
+        self.block_resources = headless if block_resources is None else block_resources
         self.playwright = None
         self.browser = None
         self.page = None
+        self.blocker = None
+        self.page_metrics = []
+        # timpul petrecut în fiecare tip de așteptare (secunde), pentru diagnostic
+        self.wait_times = {}
 
     def start(self):
         self.playwright = sync_playwright().start()
-        self.browser = self.playwright.chromium.launch(headless=self.headless, slow_mo=200)
+        self.browser = self.playwright.chromium.launch(headless=self.headless, slow_mo=self.slow_mo)
         self.page = self.browser.new_page()
+        if self.block_resources:
+            self.blocker = (self.block_resources if isinstance(self.block_resources, ResourceBlocker)
+                            else ResourceBlocker()).attach(self.page)
         self.page.goto(self.BASE_URL, wait_until="domcontentloaded")
-        time.sleep(2)
+        self._timed_wait("list_page", self.page.wait_for_selector, ".event__match", timeout=10000)
+
+    def _timed_wait(self, step, wait, *args, required=False, **kwargs):
+        """
+        Rulează o așteptare condiționată (cu timeout) și îi înregistrează durata în wait_times[step].
+        Întoarce False la timeout, sau ridică excepția dacă required=True.
+        """
+        started = time.perf_counter()
+        try:
+            wait(*args, **kwargs)
+            return True
+        except PlaywrightTimeoutError:
+            if required:
+                raise
+            return False
+        finally:
+            self.wait_times.setdefault(step, []).append(time.perf_counter() - started)
+
+    def _wait_for_more_matches(self, step, count, timeout):
+        return self._timed_wait(step, self.page.wait_for_function,
+                                "n => document.querySelectorAll('.event__match').length > n",
+                                arg=count, timeout=timeout)
 
     def stop(self):
         try:
@@ -66,35 +236,33 @@ class MatchScraper:
                 pass
 
     # --- Scroll & click "Show more" until all matches are loaded ---
-    def load_all_matches(self):
-        prev_count = 0
+    def load_all_matches(self, show_more_timeout=10000, scroll_timeout=1000):
         stable_count = 0
+        failed_clicks = 0
         while True:
-            matches = self.page.locator(".event__match")
-            count = matches.count()
+            count = self.page.locator(".event__match").count()
 
-            # Click "Show more matches" if visible
+            # Click "Show more matches" if visible, then wait until new rows appear
             try:
                 btn = self.page.locator("span:has-text('Show more matches')")
-                if btn.count() > 0:
+                if failed_clicks < 3 and btn.count() > 0:
                     btn.first.click(timeout=10000)
-                    self.page.wait_for_timeout(10000)
+                    if self._wait_for_more_matches("show_more", count, show_more_timeout):
+                        failed_clicks = 0
+                    else:
+                        failed_clicks += 1
                     continue
             except:
                 pass
 
-            # Check if new matches loaded
-            if count == prev_count:
+            # Scroll down to trigger lazy load; stop if no new matches after 3 scrolls
+            self.page.evaluate("window.scrollBy(0, document.body.scrollHeight)")
+            if self._wait_for_more_matches("scroll", count, scroll_timeout):
+                stable_count = 0
+            else:
                 stable_count += 1
-                if stable_count >= 3:  # stop if no new matches after 3 scrolls
+                if stable_count >= 3:
                     break
-            else:
-                stable_count = 0
-                prev_count = count
-
-            # Scroll down to trigger lazy load
-            self.page.evaluate("window.scrollBy(0, document.body.scrollHeight)")
-            time.sleep(1)
 
     # --- Extract all match IDs ---
     def get_all_match_ids(self):
@@ -107,6 +275,23 @@ class MatchScraper:
                 match_ids.append(event_code.split("_")[-1])
         return match_ids
 
+    # --- ID-urile meciurilor împreună cu echipele, pentru actualizarea incrementală ---
+    def get_match_index(self):
+        self.load_all_matches()
+        return self.page.evaluate("""
+            () => Array.from(document.querySelectorAll(".event__match")).filter(row => row.id).map(row => {
+                const home = row.querySelector(".event__participant--home");
+                const away = row.querySelector(".event__participant--away");
+                const time = row.querySelector(".event__time");
+                return {
+                    id: row.id.split("_").pop(),
+                    home: home ? home.innerText.trim() : "",
+                    away: away ? away.innerText.trim() : "",
+                    date_time: time ? time.innerText.trim() : ""
+                };
+            })
+        """)
+
     # --- Extraction helpers ---
     def extract_summary(self, page):
         events = []
@@ -253,12 +438,8 @@ class MatchScraper:
             pass
         return coaches
 
-    # --- Open match page and extract all data ---
-    def open_match_and_extract(self, match_url) -> MatchDetail:
-        self.page.goto(match_url, wait_until="domcontentloaded")
-        time.sleep(2)
-
-        container = self.page.locator(".duelParticipant__container").first
+    def extract_header(self, page) -> MatchDetail:
+        container = page.locator(".duelParticipant__container").first
 
         date_time = ""
         try:
@@ -283,19 +464,32 @@ class MatchScraper:
             status = container.locator(".detailScore__status span").first.inner_text()
         except:
             try:
-                status = self.page.locator(".fixedHeaderDuel__detailStatus").first.inner_text()
+                status = page.locator(".fixedHeaderDuel__detailStatus").first.inner_text()
             except:
                 status = ""
 
-        match = MatchDetail(date_part, time_part, home, away, home_goals, away_goals, status)
+        return MatchDetail(date_part, time_part, home, away, home_goals, away_goals, status)
+
+    # --- Open match page and extract all data ---
+    def open_match_and_extract(self, match_url) -> MatchDetail:
+        started = time.perf_counter()
+        snapshot = self.blocker.snapshot() if self.blocker is not None else None
+        self.page.goto(match_url, wait_until="domcontentloaded")
+        load_seconds = time.perf_counter() - started
+        self._timed_wait("match_page", self.page.wait_for_selector, ".duelParticipant__container", timeout=10000)
+
+        match = match_detail_from_header(self.page.evaluate(HEADER_SCRIPT)) if self.bulk_extract \
+            else self.extract_header(self.page)
 
         # --- Summary tab ---
         try:
             tab_summary = self.page.locator("div[data-testid='wcl-tabs'] button:has-text('Summary')")
             if tab_summary.count():
                 tab_summary.first.click()
-                self.page.wait_for_selector(".smv__participantRow", timeout=10000)
-                match.summary = self.extract_summary(self.page)
+                self._timed_wait("summary_tab", self.page.wait_for_selector, ".smv__participantRow",
+                                 timeout=10000, required=True)
+                match.summary = self.page.evaluate(SUMMARY_SCRIPT) if self.bulk_extract \
+                    else self.extract_summary(self.page)
         except Exception as e:
             print(f"⚠️ Could not extract summary: {e}")
 
@@ -304,8 +498,10 @@ class MatchScraper:
             tab_stats = self.page.locator("div[data-testid='wcl-tabs'] button:has-text('Stats')")
             if tab_stats.count():
                 tab_stats.first.click()
-                self.page.wait_for_selector("div[data-testid='wcl-statistics']", timeout=10000)
-                match.statistics = self.extract_statistics(self.page)
+                self._timed_wait("stats_tab", self.page.wait_for_selector, "div[data-testid='wcl-statistics']",
+                                 timeout=10000, required=True)
+                match.statistics = self.page.evaluate(STATISTICS_SCRIPT) if self.bulk_extract \
+                    else self.extract_statistics(self.page)
         except Exception as e:
             print(f"⚠️ Could not extract statistics: {e}")
 
@@ -314,8 +510,9 @@ class MatchScraper:
             tab_lineups = self.page.locator("div[data-testid='wcl-tabs'] button:has-text('Lineups')")
             if tab_lineups.count():
                 tab_lineups.first.click()
-                self.page.wait_for_selector("div.lf__lineUp", timeout=10000)
-                match.lineups = {
+                self._timed_wait("lineups_tab", self.page.wait_for_selector, "div.lf__lineUp",
+                                 timeout=10000, required=True)
+                match.lineups = self.page.evaluate(LINEUPS_SCRIPT) if self.bulk_extract else {
                     "formation": self.extract_formation(self.page),
                     "starting_lineups": self.extract_starting_lineups(self.page),
                     "substitutes": self.extract_substitutes(self.page),
@@ -326,4 +523,147 @@ class MatchScraper:
         except Exception as e:
             print(f"⚠️ Could not extract lineups: {e}")
 
+        self.page_metrics.append(page_metrics(match_url, started, load_seconds, self.blocker, snapshot))
+        return match
+
+
+class AsyncMatchScraper:
+    """
+    Varianta asyncio pentru paginile de meci: un pool de concurrency contexte de browser extrage meciurile
+    în paralel, cu o pauză minimă (politeness_delay) între două cereri către același host.
+    Rezultatele păstrează ordinea ID-urilor primite, ca în varianta secvențială. Extragerea folosește doar
+    scripturile page.evaluate (comparate cu locatorii din MatchScraper în tests/), de aceea main.py o
+    folosește doar cu concurrency > 1 cerut explicit.
+    """
+
+    MATCH_URL = "https://www.flashscore.com/match/{}/#/match-summary"
+
+    def __init__(self, headless=True, concurrency=4, politeness_delay=0.5, match_url=None, block_resources=None):
+        self.headless = headless
+        self.block_resources = headless if block_resources is None else block_resources
+        self.concurrency = concurrency
+        self.politeness_delay = politeness_delay
+        self.match_url = match_url or self.MATCH_URL
+        self.playwright = None
+        self.browser = None
+        self.contexts = []
+        self.pages = None
+        self.blockers = {}
+        self.page_metrics = []
+        # timpul petrecut în fiecare tip de așteptare (secunde), cu aceleași chei ca MatchScraper.wait_times
+        self.wait_times = {}
+        self._host_lock = None
+        self._last_request = {}
+
+    async def start(self):
+        self.playwright = await async_playwright().start()
+        self.browser = await self.playwright.chromium.launch(headless=self.headless)
+        self.pages = asyncio.Queue()
+        self._host_lock = asyncio.Lock()
+        for _ in range(self.concurrency):
+            context = await self.browser.new_context()
+            self.contexts.append(context)
+            page = await context.new_page()
+            if self.block_resources:
+                # câte un blocker per pagină, ca metricile să fie per meci și în paralel
+                self.blockers[page] = await ResourceBlocker().attach_async(page)
+            await self.pages.put(page)
+
+    async def stop(self):
+        for context in self.contexts:
+            try:
+                await context.close()
+            except:
+                pass
+        try:
+            await self.browser.close()
+        except:
+            pass
+        try:
+            await self.playwright.stop()
+        except:
+            pass
+
+    async def _timed_wait(self, step, wait, *args, required=False, **kwargs):
+        """Varianta asyncio a MatchScraper._timed_wait: înregistrează durata în wait_times[step]."""
+        started = time.perf_counter()
+        try:
+            await wait(*args, **kwargs)
+            return True
+        except PlaywrightTimeoutError:
+            if required:
+                raise
+            return False
+        finally:
+            self.wait_times.setdefault(step, []).append(time.perf_counter() - started)
+
+    async def _wait_for_turn(self, url):
+        # cererile către același host sunt distanțate cu cel puțin politeness_delay secunde
+        host = urlparse(url).netloc
+        async with self._host_lock:
+            wait = self._last_request.get(host, 0) + self.politeness_delay - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._last_request[host] = time.monotonic()
+
+    async def scrape_matches(self, match_ids):
+        """Extrage toate meciurile; întoarce lista de MatchDetail în ordinea ID-urilor (None pentru erori)."""
+        total = len(match_ids)
+
+        async def scrape_one(i, m_id):
+            match_url = self.match_url.format(m_id)
+            page = await self.pages.get()
+            try:
+                await self._wait_for_turn(match_url)
+                print(f"Scraping match {i + 1}/{total} -> {match_url}")
+                match = await self.open_match_and_extract(page, match_url)
+                match.match_id = m_id
+                return match
+            except Exception as e:
+                print(f"Error scraping match {i + 1}: {e}")
+                return None
+            finally:
+                self.pages.put_nowait(page)
+
+        return await asyncio.gather(*(scrape_one(i, m_id) for i, m_id in enumerate(match_ids)))
+
+    @classmethod
+    def run(cls, match_ids, **kwargs):
+        """Punct de intrare sincron: pornește browserul, extrage meciurile și îl oprește."""
+        async def main():
+            scraper = cls(**kwargs)
+            await scraper.start()
+            try:
+                return await scraper.scrape_matches(match_ids)
+            finally:
+                await scraper.stop()
+
+        return asyncio.run(main())
+
+    # --- Open match page and extract all data ---
+    async def open_match_and_extract(self, page, match_url) -> MatchDetail:
+        started = time.perf_counter()
+        blocker = self.blockers.get(page)
+        snapshot = blocker.snapshot() if blocker is not None else None
+        await page.goto(match_url, wait_until="domcontentloaded")
+        load_seconds = time.perf_counter() - started
+        await self._timed_wait("match_page", page.wait_for_selector, ".duelParticipant__container",
+                               timeout=10000, required=True)
+
+        match = match_detail_from_header(await page.evaluate(HEADER_SCRIPT))
+
+        tabs = [("Summary", "summary_tab", ".smv__participantRow", "summary", SUMMARY_SCRIPT),
+                ("Stats", "stats_tab", "div[data-testid='wcl-statistics']", "statistics", STATISTICS_SCRIPT),
+                ("Lineups", "lineups_tab", "div.lf__lineUp", "lineups", LINEUPS_SCRIPT)]
+        for tab_text, step, selector, attribute, script in tabs:
+            try:
+                tab = page.locator(f"div[data-testid='wcl-tabs'] button:has-text('{tab_text}')")
+                if await tab.count():
+                    await tab.first.click()
+                    await self._timed_wait(step, page.wait_for_selector, selector, timeout=10000, required=True)
+                    setattr(match, attribute, await page.evaluate(script))
+            except Exception as e:
+                print(f"⚠️ Could not extract {attribute}: {e}")
+
+        self.page_metrics.append(page_metrics(match_url, started, load_seconds, blocker, snapshot))
         return match
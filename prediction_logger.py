@@ -0,0 +1,166 @@
+import atexit
+import csv
+import io
+import multiprocessing.util
+import os
+import sqlite3
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: rămâne doar lock-ul din proces
+    fcntl = None
+
+
+class PredictionLogger:
+    """
+    Jurnal de predicții cu buffer: rândurile se adună în memorie și se scriu în lot
+    (la batch_size rânduri, la fiecare flush_interval secunde, la flush() sau la închiderea procesului,
+    inclusiv a proceselor copil din multiprocessing, care nu rulează atexit).
+    Sink-ul poate fi un CSV (append) sau o bază SQLite (o tabelă append-only).
+    """
+
+    def __init__(self, path="predictions_log.csv", sink="csv", batch_size=50, flush_interval=5.0,
+                 table="predictions"):
+        if sink not in ("csv", "sqlite"):
+            raise ValueError(f"Sink necunoscut: {sink}")
+        self.path = path
+        self.sink = sink
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.table = table
+        self.columns = None
+        self._ignored = set()
+        self._reset_state()
+        atexit.register(self.close)
+        multiprocessing.util.register_after_fork(self, PredictionLogger._after_fork)
+
+    def _reset_state(self):
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._closed = threading.Event()
+        self._timer = None
+        # procesele copil din multiprocessing ies cu os._exit, fără atexit, dar rulează finalizatorii cu prioritate
+        multiprocessing.util.Finalize(self, self.close, exitpriority=10)
+
+    def _after_fork(self):
+        # rândurile din buffer aparțin procesului părinte, care le scrie el; copilul pornește cu buffer gol
+        self._reset_state()
+
+    def log(self, row):
+        """Adaugă un rând în buffer; scrierea pe disc se face în lot."""
+        with self._lock:
+            self._buffer.append(row)
+            full = len(self._buffer) >= self.batch_size
+            if self._timer is None and self.flush_interval:
+                self._timer = threading.Thread(target=self._flush_periodically, daemon=True)
+                self._timer.start()
+        if full:
+            self.flush()
+        return self
+
+    def _flush_periodically(self):
+        while not self._closed.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        # bufferul se golește sub lock, scrierea se face separat ca log() să nu aștepte după disc
+        with self._io_lock:
+            with self._lock:
+                rows, self._buffer = self._buffer, []
+            if not rows:
+                return self
+            if self.sink == "csv":
+                self._write_csv(rows)
+            else:
+                self._write_sqlite(rows)
+        return self
+
+    def close(self):
+        self._closed.set()
+        self.flush()
+
+    def _header(self, rows):
+        # antetul unui fișier existent are prioritate, ca rândurile noi să rămână aliniate cu cele vechi
+        if self.columns is None:
+            if self.sink == "csv" and os.path.isfile(self.path) and os.path.getsize(self.path) > 0:
+                with open(self.path, "r", encoding="utf-8-sig", newline="") as f:
+                    self.columns = next(csv.reader(f))
+            else:
+                self.columns = []
+        for row in rows:
+            self.columns.extend(key for key in row if key not in self.columns)
+        return self.columns
+
+    def _write_csv(self, rows):
+        # un singur write per lot, sub lock pe fișier, ca procesele concurente să nu-și amestece rândurile;
+        # dacă fișierul e nou se decide abia după lock, ca antetul să fie scris o singură dată
+        with open(self.path, "ab") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                new_file = os.fstat(f.fileno()).st_size == 0
+                if new_file and self.columns is None:
+                    self.columns = []
+                # nu putem adăuga coloane într-un CSV existent; cheile noi se ignoră
+                columns = self._header(rows if new_file else [])
+                ignored = {key for row in rows for key in row if key not in columns} - self._ignored
+                if ignored:
+                    self._ignored |= ignored
+                    print(f"⚠️ {self.path}: coloane care nu există în antetul fișierului, ignorate: "
+                          f"{sorted(ignored)}")
+
+                buffer = io.StringIO()
+                writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore", lineterminator="\n")
+                if new_file:
+                    writer.writeheader()
+                writer.writerows(rows)
+                f.write(buffer.getvalue().encode("utf-8-sig" if new_file else "utf-8"))
+                f.flush()
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _write_sqlite(self, rows):
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            connection.execute("PRAGMA journal_mode=WAL")
+            # schema și inserarea în aceeași tranzacție de scriere, ca procesele concurente să nu se calce
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.execute(f'CREATE TABLE IF NOT EXISTS "{self.table}" (Logged_At REAL)')
+                existing = {info[1] for info in connection.execute(f'PRAGMA table_info("{self.table}")')}
+                for column in self._header(rows):
+                    if column not in existing:
+                        connection.execute(f'ALTER TABLE "{self.table}" ADD COLUMN "{column}"')
+
+                columns = ["Logged_At"] + self.columns
+                placeholders = ", ".join("?" for _ in columns)
+                names = ", ".join(f'"{column}"' for column in columns)
+                now = time.time()
+                connection.executemany(
+                    f'INSERT INTO "{self.table}" ({names}) VALUES ({placeholders})',
+                    [[now] + [row.get(column) for column in self.columns] for row in rows])
+                connection.execute("COMMIT")
+            except Exception:
+                connection.execute("ROLLBACK")
+                raise
+        finally:
+            connection.close()
+
+
+_loggers = {}
+_loggers_lock = threading.Lock()
+
+
+def get_prediction_logger(path="predictions_log.csv", **kwargs):
+    """Un singur logger per fișier în tot procesul (sesiunile Streamlit îl împart)."""
+    key = os.path.abspath(path)
+    with _loggers_lock:
+        if key not in _loggers:
+            sink = "sqlite" if os.path.splitext(path)[1] in (".db", ".sqlite", ".sqlite3") else "csv"
+            # calea absolută: scrierea se poate face mai târziu (timer, atexit), după o schimbare de director
+            _loggers[key] = PredictionLogger(key, sink=kwargs.pop("sink", sink), **kwargs)
+        return _loggers[key]
@@ -0,0 +1,87 @@
+from urllib.parse import urlparse
+
+# citim doar text din DOM, deci imaginile, fonturile și media nu sunt necesare
+DEFAULT_BLOCKED_TYPES = ("image", "media", "font")
+
+# reclame și tracking întâlnite pe paginile Flashscore
+DEFAULT_BLOCKED_DOMAINS = (
+    "doubleclick.net", "googlesyndication.com", "googleadservices.com", "google-analytics.com",
+    "googletagmanager.com", "googletagservices.com", "adservice.google.com", "amazon-adsystem.com",
+    "scorecardresearch.com", "facebook.net", "criteo.com", "criteo.net", "taboola.com", "outbrain.com",
+    "adnxs.com", "rubiconproject.com", "pubmatic.com", "casalemedia.com", "hotjar.com")
+
+
+class ResourceBlocker:
+    """
+    Blochează prin page.route/context.route resursele grele sau inutile (după tipul resursei și domeniu)
+    și numără cererile, cererile blocate și octeții transferați.
+    allowed_domains are prioritate față de orice regulă de blocare.
+    """
+
+    def __init__(self, blocked_types=DEFAULT_BLOCKED_TYPES, blocked_domains=DEFAULT_BLOCKED_DOMAINS,
+                 allowed_domains=()):
+        self.blocked_types = set(blocked_types)
+        self.blocked_domains = tuple(blocked_domains)
+        self.allowed_domains = tuple(allowed_domains)
+        self.requests = 0
+        self.blocked = 0
+        self.bytes = 0
+
+    @staticmethod
+    def _matches(host, domains):
+        return any(host == domain or host.endswith("." + domain) for domain in domains)
+
+    def should_block(self, request):
+        host = urlparse(request.url).hostname or ""
+        if self._matches(host, self.allowed_domains):
+            return False
+        return request.resource_type in self.blocked_types or self._matches(host, self.blocked_domains)
+
+    def snapshot(self):
+        return {"requests": self.requests, "blocked": self.blocked, "bytes": self.bytes}
+
+    def since(self, snapshot):
+        """Diferența față de un snapshot anterior (pentru metrici per meci)."""
+        return {key: value - snapshot[key] for key, value in self.snapshot().items()}
+
+    # --- API sincron (MatchScraper, StandingsScraper) ---
+    def attach(self, target):
+        target.route("**/*", self._route)
+        target.on("requestfinished", self._finished)
+        return self
+
+    def _route(self, route):
+        if self.should_block(route.request):
+            self.blocked += 1
+            route.abort()
+        else:
+            route.continue_()
+
+    def _finished(self, request):
+        self.requests += 1
+        try:
+            sizes = request.sizes()
+            self.bytes += sizes["responseBodySize"] + sizes["responseHeadersSize"]
+        except:
+            pass
+
+    # --- API asyncio (AsyncMatchScraper) ---
+    async def attach_async(self, target):
+        await target.route("**/*", self._route_async)
+        target.on("requestfinished", self._finished_async)
+        return self
+
+    async def _route_async(self, route):
+        if self.should_block(route.request):
+            self.blocked += 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def _finished_async(self, request):
+        self.requests += 1
+        try:
+            sizes = await request.sizes()
+            self.bytes += sizes["responseBodySize"] + sizes["responseHeadersSize"]
+        except:
+            pass
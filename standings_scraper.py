@@ -2,18 +2,26 @@ from playwright.sync_api import sync_playwright
 import json
 import os
 
+from resource_blocker import ResourceBlocker
+
 class StandingsScraper:
-    def __init__(self, url, headless=True):
+    def __init__(self, url, headless=True, block_resources=None):
         self.URL = url
         self.headless = headless
+        # blocarea resurselor grele e activă implicit doar în modul headless
+        self.block_resources = headless if block_resources is None else block_resources
         self.playwright = None
         self.browser = None
         self.page = None
+        self.blocker = None
 
     def start(self):
         self.playwright = sync_playwright().start()
         self.browser = self.playwright.chromium.launch(headless=self.headless)
         self.page = self.browser.new_page()
+        if self.block_resources:
+            self.blocker = (self.block_resources if isinstance(self.block_resources, ResourceBlocker)
+                            else ResourceBlocker()).attach(self.page)
         self.page.goto(self.URL)
         self.accept_cookies()
         self.page.wait_for_selector("div.ui-table__row", timeout=10000)
@@ -0,0 +1,59 @@
+import asyncio
+import functools
+import os
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sync_api = pytest.importorskip("playwright.sync_api")
+
+from match_scraper import AsyncMatchScraper, MatchScraper
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "match_pages")
+MATCH_IDS = ["farul-petrolul", "atletico-real"]
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def match_url():
+    """Servește paginile salvate pe un port local; {} e înlocuit cu ID-ul meciului."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(QuietHandler, directory=FIXTURES))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/{{}}-summary.html"
+    server.shutdown()
+    server.server_close()
+
+
+def test_async_scraper_matches_sequential_locators(match_url):
+    scraper = MatchScraper(None)
+    with sync_api.sync_playwright() as playwright:
+        scraper.browser = playwright.chromium.launch()
+        scraper.page = scraper.browser.new_page()
+        expected = []
+        for m_id in MATCH_IDS:
+            match = scraper.open_match_and_extract(match_url.format(m_id))
+            match.match_id = m_id
+            expected.append(match.to_dict())
+        scraper.browser.close()
+
+    async def scrape():
+        scraper = AsyncMatchScraper(concurrency=2, politeness_delay=0, match_url=match_url)
+        await scraper.start()
+        try:
+            return scraper, await scraper.scrape_matches(MATCH_IDS)
+        finally:
+            await scraper.stop()
+
+    async_scraper, matches = asyncio.run(scrape())
+
+    assert [match.to_dict() for match in matches] == expected
+    assert {step: len(times) for step, times in async_scraper.wait_times.items()} == \
+        {step: len(times) for step, times in scraper.wait_times.items()}
+    assert all(match["summary"] and match["statistics"] and match["lineups"] for match in expected)
+    assert [match["status"] for match in expected] == ["FINISHED", "AFTER PENALTIES"]
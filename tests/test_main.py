@@ -0,0 +1,79 @@
+import pytest
+
+pytest.importorskip("playwright")
+
+from main import update_matches
+
+
+def saved(home, away, date, status="FINISHED", **extra):
+    return {"date": date, "time": "20:00", "home": home, "away": away, "status": status, **extra}
+
+
+def listed(m_id, home, away, date_time):
+    return {"id": m_id, "home": home, "away": away, "date_time": date_time}
+
+
+class Scraper:
+    """Înlocuiește scrape_match_details: întoarce meciurile din pages și reține ce ID-uri s-au cerut."""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.requested = []
+
+    def __call__(self, match_ids):
+        self.requested.extend(match_ids)
+        return [{"id": m_id, **self.pages[m_id]} for m_id in match_ids if m_id in self.pages]
+
+
+def test_repeated_pairs_are_matched_once_in_list_order():
+    # aceeași pereche de două ori în sezon (play-off), fișier vechi fără "id"
+    existing = [saved("FCSB", "CFR Cluj", "20.05.2025", goals="1-1"),
+                saved("FCSB", "CFR Cluj", "02.02.2025", goals="2-0")]
+    index = [listed("b", "FCSB", "CFR Cluj", "20.05. 20:00"),
+             listed("a", "FCSB", "CFR Cluj", "02.02. 20:00")]
+    scrape = Scraper({})
+
+    matches = update_matches(existing, index, scrape)
+
+    assert scrape.requested == []
+    assert [(m["id"], m["goals"]) for m in matches] == [("b", "1-1"), ("a", "2-0")]
+
+
+def test_repeated_pairs_without_list_dates_use_saved_order():
+    existing = [saved("Genk", "Gent", "20.05.2025", goals="3-1"),
+                saved("Genk", "Gent", "02.02.2025", goals="0-0")]
+    index = [listed("b", "Genk", "Gent", ""), listed("a", "Genk", "Gent", "")]
+
+    matches = update_matches(existing, index, Scraper({}))
+
+    assert [(m["id"], m["goals"]) for m in matches] == [("b", "3-1"), ("a", "0-0")]
+
+
+def test_rescraped_match_replaces_record_with_other_team_names():
+    # numele din lista de rezultate diferă de cel din pagina meciului: meciul se extrage din nou o dată
+    existing = [saved("Atl. Madrid", "Real Madrid", "12.03.2025"), saved("Sevilla", "Betis", "01.03.2025")]
+    index = [listed("x", "Atletico Madrid", "Real Madrid", "12.03. 21:00"),
+             listed("y", "Sevilla", "Betis", "01.03. 18:00")]
+    scrape = Scraper({"x": saved("Atl. Madrid", "Real Madrid", "12.03.2025")})
+
+    matches = update_matches(existing, index, scrape)
+
+    assert scrape.requested == ["x"]
+    assert [m["id"] for m in matches] == ["x", "y"]
+
+
+def test_unfinished_failed_and_unlisted_matches():
+    existing = [saved("A", "B", "01.09.2025", id="1", status="POSTPONED"),
+                saved("C", "D", "01.09.2025", id="2"),
+                saved("E", "F", "01.08.2025", id="old"),
+                saved("G", "H", "01.07.2025")]
+    index = [listed("3", "I", "J", "02.09. 18:00"), listed("1", "A", "B", "01.09. 18:00"),
+             listed("2", "C", "D", "01.09. 20:00")]
+    scrape = Scraper({"1": saved("A", "B", "01.09.2025")})
+
+    matches = update_matches(existing, index, scrape)
+
+    # "3" e nou dar extragerea lui eșuează; "1" nu era terminat; "2" e deja salvat
+    assert scrape.requested == ["3", "1"]
+    assert [m.get("id") for m in matches] == ["1", "2", "old", None]
+    assert matches[0]["status"] == "FINISHED"
@@ -0,0 +1,170 @@
+import os
+import shutil
+
+import joblib
+import pandas as pd
+import pytest
+
+from match_predictor import FootballMatchPredictor
+
+LEAGUES = ["romania-superliga-2025-2026", "jupiler-pro-league-2025-2026"]
+
+
+@pytest.fixture
+def winrate_csvs(processed_dir, tmp_path):
+    paths = []
+    for league in LEAGUES:
+        path = str(tmp_path / f"standings-with-winrate-features-{league}.csv")
+        shutil.copy(os.path.join(processed_dir, f"standings-with-winrate-features-{league}.csv"), path)
+        paths.append(path)
+    return paths
+
+
+def drop_last_dates(csv_path, n_dates=3):
+    df = pd.read_csv(csv_path)
+    dates = pd.to_datetime(df["Date"], format="%d.%m.%Y")
+    df[~dates.isin(dates.drop_duplicates().nlargest(n_dates))].to_csv(csv_path, index=False)
+
+
+def test_full_rebuild_keeps_stat_mode(winrate_csvs, tmp_path):
+    model_path = str(tmp_path / "models.joblib")
+    FootballMatchPredictor(winrate_csvs).load_or_train(model_path, stat_mode="multi_output")
+
+    drop_last_dates(winrate_csvs[0])
+    predictor = FootballMatchPredictor(winrate_csvs).update_or_train(model_path, full_rebuild_every=1)
+
+    assert predictor.stat_mode == "multi_output"
+    assert "stats" in predictor.models
+
+
+def test_update_models_trains_only_on_train_split(winrate_csvs, tmp_path):
+    model_path = str(tmp_path / "models.joblib")
+    full = pd.read_csv(winrate_csvs[0])
+    drop_last_dates(winrate_csvs[0])
+    FootballMatchPredictor(winrate_csvs).load_or_train(model_path)
+
+    full.to_csv(winrate_csvs[0], index=False)
+    predictor = FootballMatchPredictor(winrate_csvs)
+    assert predictor.load(model_path, allow_stale=True)
+
+    fitted_rows = []
+    model = predictor.models["corners_home"]
+    fit = model.fit
+    model.fit = lambda X, y: fitted_rows.append(len(X)) or fit(X, y)
+    assert predictor.update_models(recent_window=len(predictor.df))
+
+    train_idx, _ = predictor.split_indices(0.3)
+    assert fitted_rows == [len(train_idx)]
+
+
+def test_predict_fixtures_matches_single_predictions(winrate_csvs, tmp_path):
+    # o echipă care apare doar ca adversar: e în team_encoder, dar nu are rând propriu în team_index
+    df = pd.read_csv(winrate_csvs[0])
+    opponent_only = df["Team"].iloc[0]
+    df[df["Team"] != opponent_only].to_csv(winrate_csvs[0], index=False)
+    predictor = FootballMatchPredictor(winrate_csvs).load_or_train(str(tmp_path / "models.joblib"))
+    assert opponent_only in predictor.team_encoder.classes_
+
+    teams = sorted(predictor.team_index()["Team"])
+    pairs = [(teams[0], teams[1]), (teams[5], teams[20]), (teams[-1], teams[2]),
+             (teams[3], opponent_only), (opponent_only, teams[4]), (teams[6], "Echipa Inexistentă")]
+    results = predictor.predict_fixtures(pairs)
+
+    expected = [(home, away, predictor._predict_match(home, away)) for home, away in pairs]
+    expected = [(home, away, prediction) for home, away, prediction in expected if prediction is not None]
+    assert len(expected) == 3
+    assert list(zip(results["Home_Team"], results["Away_Team"])) == [(home, away) for home, away, _ in expected]
+
+    for (_, _, prediction), (_, row) in zip(expected, results.iterrows()):
+        outcome, proba = prediction['outcome']
+        assert row["Predicted_Outcome"] == outcome
+        assert row[["Proba_Draw", "Proba_Home_Win", "Proba_Away_Win"]].to_numpy(dtype=float) \
+            == pytest.approx(proba)
+        assert row["Predicted_Goals"] == prediction['goals']
+        assert row["Predicted_Score"] == prediction['score']
+        for side in ("home", "away"):
+            for target, value in prediction['stats'][side].items():
+                assert row[f"{target}_{side}"] == pytest.approx(value)
+
+
+def test_team_index_serves_latest_match_by_date(winrate_csvs, tmp_path):
+    # ordinea din fișier inversată față de cea cronologică
+    df = pd.read_csv(winrate_csvs[0]).iloc[::-1].reset_index(drop=True)
+    team, other = df["Team"].unique()[:2]
+    # două meciuri ale echipei la aceeași dată și oră: câștigă cel aflat mai jos în fișier
+    first, second = df.index[df["Team"] == team][[0, 1]]
+    df.loc[[first, second], ["Date", "Time"]] = ["31.12.2030", "20:00"]
+    df.loc[first, "win_rate_global"], df.loc[second, "win_rate_global"] = 0.111, 0.222
+    df.to_csv(winrate_csvs[0], index=False)
+
+    predictor = FootballMatchPredictor(winrate_csvs)
+    assert predictor._get_team_stats(team)["win_rate_global"] == 0.222
+
+    other_rows = predictor.df[predictor.df["Team"] == other]
+    latest = predictor._get_team_stats(other)
+    assert latest["Date"] == other_rows["Date"].max()
+    assert latest["Date"] != other_rows["Date"].iloc[-1]
+
+    new_match = df[df["Team"] == team].head(1).assign(Date="01.01.2031", win_rate_global=0.333)
+    new_csv = str(tmp_path / "new-matches.csv")
+    new_match.to_csv(new_csv, index=False)
+    predictor.append_csv([new_csv])
+
+    assert predictor._latest is None
+    assert predictor._get_team_stats(team)["win_rate_global"] == 0.333
+
+
+def test_load_refuses_changed_data_and_load_or_train_retrains(winrate_csvs, tmp_path, monkeypatch):
+    model_path = str(tmp_path / "models.joblib")
+    trained = FootballMatchPredictor(winrate_csvs).load_or_train(model_path)
+
+    # aceleași date: modelele salvate se încarcă, fără reantrenare
+    def no_training(*args, **kwargs):
+        raise AssertionError("modelele nu trebuiau reantrenate")
+
+    same = FootballMatchPredictor(winrate_csvs)
+    monkeypatch.setattr(same, "train_models", no_training)
+    assert same.load_or_train(model_path).fingerprint == trained.fingerprint
+
+    drop_last_dates(winrate_csvs[0])
+    changed = FootballMatchPredictor(winrate_csvs)
+    assert changed.fingerprint != trained.fingerprint
+    assert not changed.load(model_path)
+    assert not changed.models
+    assert changed.load(model_path, allow_stale=True)
+
+    changed = FootballMatchPredictor(winrate_csvs).load_or_train(model_path)
+    assert joblib.load(model_path)["fingerprint"] == changed.fingerprint
+    assert FootballMatchPredictor(winrate_csvs).load(model_path)
+
+
+def test_prediction_cache_counts_and_invalidation(winrate_csvs, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    full = pd.read_csv(winrate_csvs[0])
+    drop_last_dates(winrate_csvs[0])
+    kept = pd.read_csv(winrate_csvs[0])
+    new_csv = str(tmp_path / "new-matches.csv")
+    full.merge(kept, how="left", indicator=True).query("_merge == 'left_only'") \
+        .drop(columns="_merge").to_csv(new_csv, index=False)
+
+    model_path = str(tmp_path / "models.joblib")
+    predictor = FootballMatchPredictor(winrate_csvs).load_or_train(model_path)
+    home, away = sorted(predictor.team_index()["Team"])[:2]
+    cache = predictor.prediction_cache
+
+    first = predictor.predict_future_match(home, away)
+    assert predictor.predict_future_match(home, away) is first
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    invalidations = [("load", lambda: predictor.load(model_path)),
+                     ("train_models", lambda: predictor.train_models()),
+                     ("append_csv", lambda: predictor.append_csv([new_csv])),
+                     ("update_models", lambda: predictor.update_models())]
+    for name, invalidate in invalidations:
+        predictor.predict_future_match(home, away)
+        assert cache.stats()["size"] == 1, name
+        assert invalidate(), name
+        assert cache.stats()["size"] == 0, name
+        misses = cache.misses
+        predictor.predict_future_match(home, away)
+        assert cache.misses == misses + 1, name
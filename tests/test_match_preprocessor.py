@@ -0,0 +1,83 @@
+import os
+
+import pandas as pd
+
+from match_preprocessor import MatchPreprocessor
+
+
+def test_run_with_saved_params_matches_fit(processed_dir, tmp_path):
+    csv_path = os.path.join(processed_dir, "standings-with-matches-bundesliga-2024-2025-clean.csv")
+    output = str(tmp_path / "cleaned.csv")
+    fitted = MatchPreprocessor(csv_path).load_csv().run().save_csv(output)
+
+    reused = MatchPreprocessor(csv_path).load_params(MatchPreprocessor.params_path(output)) \
+        .load_csv().run()
+
+    assert reused.params == fitted.params
+    assert reused.df.dtypes.equals(fitted.df.dtypes)
+    assert reused.df.to_csv(index=False) == fitted.df.to_csv(index=False)
+
+
+def test_run_matches_step_by_step_chain_with_goals_column(capsys):
+    df = pd.DataFrame({
+        "Team": ["A", "B", "C", "D"],
+        "Goals": ["45:30", "5:3", "100:30", "12:9"],
+        "Points": [70, 12, 40, 33],
+        "Ball_Possession": ["55%", "45%", "61%", "50%"],
+        "Red_Cards": [0, 0, 0, 0]})
+
+    chain = MatchPreprocessor(None)
+    chain.df = df.copy()
+    chain.fill_missing(0) \
+        .convert_numeric_and_percentage() \
+        .split_goals_column() \
+        .drop_zero_heavy_columns() \
+        .normalize_large_stats()
+
+    fused = MatchPreprocessor(None)
+    fused.df = df.copy()
+    fused.run(downcast=False)
+
+    assert fused.df.to_csv(index=False) == chain.df.to_csv(index=False)
+    assert fused.df["team_total_goals_home"].tolist() == [45, 5, 100, 12]
+    assert fused.df["team_total_goals_away"].tolist() == [30, 3, 30, 9]
+
+
+def split(values):
+    home_away, malformed = MatchPreprocessor._split_goals(pd.Series(values))
+    return home_away.to_numpy().tolist(), malformed
+
+
+def test_split_goals_colon_form():
+    assert split(["2:1", "0:0", "10:3", "1:12"]) == ([[2, 1], [0, 0], [10, 3], [1, 12]], 0)
+
+
+def test_split_goals_packed_form():
+    # primele două cifre sunt golurile gazdelor, restul ale oaspeților; zerourile din față se ignoră
+    assert split(["201", "4530", "10030", 1203, "0453"]) == ([[20, 1], [45, 30], [10, 30], [12, 3], [45, 3]], 0)
+
+
+def test_split_goals_signs_and_whitespace():
+    assert split([" 3 : 1 ", "+2:-1", "\t4:0\n", " +1203 ", "1:2:3"]) == \
+        ([[3, 1], [2, -1], [4, 0], [12, 3], [1, 2]], 0)
+
+
+def test_split_goals_counts_malformed_values(capsys):
+    home_away, malformed = MatchPreprocessor._split_goals(pd.Series(["2:1", "abc", "12", "", "1-0", ":3", "3:1"]))
+
+    assert malformed == 5
+    assert home_away.iloc[[0, 6]].to_numpy().tolist() == [[2, 1], [3, 1]]
+    assert home_away.iloc[1:6].isna().all().all()
+    assert "5 valori" in capsys.readouterr().out
+
+
+def test_goals_malformed_is_set_by_both_modes():
+    df = pd.DataFrame({"Goals": ["2:1", "x", "3:0", None], "Points": [3, 0, 3, 1]})
+    chain = MatchPreprocessor(None)
+    chain.df = df.copy()
+    chain.fill_missing(0).convert_numeric_and_percentage().split_goals_column()
+    fused = MatchPreprocessor(None)
+    fused.df = df.copy()
+    fused.run()
+
+    assert chain.goals_malformed == fused.goals_malformed == 2
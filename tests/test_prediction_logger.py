@@ -0,0 +1,114 @@
+import csv
+import multiprocessing
+import sqlite3
+import threading
+
+import pytest
+
+from prediction_logger import PredictionLogger, get_prediction_logger
+
+WORKERS, THREADS, ROWS = 3, 4, 300
+
+
+def log_rows(logger, worker, thread):
+    for i in range(ROWS):
+        # check repetă celelalte câmpuri, ca un rând amestecat cu altul să fie detectat
+        logger.log({"worker": worker, "thread": thread, "i": i, "check": f"{worker}-{thread}-{i}"})
+
+
+def log_from_threads(logger, worker):
+    threads = [threading.Thread(target=log_rows, args=(logger, worker, t)) for t in range(THREADS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+def process_worker(path, worker):
+    # fără close(): rândurile rămase în buffer trebuie scrise la ieșirea procesului copil
+    log_from_threads(get_prediction_logger(path, batch_size=7, flush_interval=0), worker)
+
+
+def read_csv_rows(path):
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        return list(csv.reader(f))
+
+
+def read_sqlite_rows(path):
+    connection = sqlite3.connect(path)
+    try:
+        return connection.execute('SELECT worker, thread, i, "check" FROM predictions').fetchall()
+    finally:
+        connection.close()
+
+
+def expected_rows(workers):
+    return sorted((str(w), str(t), str(i), f"{w}-{t}-{i}")
+                  for w in workers for t in range(THREADS) for i in range(ROWS))
+
+
+@pytest.mark.parametrize("sink", ["csv", "sqlite"])
+def test_threads_write_every_row_once(tmp_path, sink):
+    path = str(tmp_path / ("log.csv" if sink == "csv" else "log.db"))
+    logger = PredictionLogger(path, sink=sink, batch_size=7, flush_interval=0.01)
+    log_from_threads(logger, 0)
+    logger.close()
+
+    if sink == "csv":
+        header, *rows = read_csv_rows(path)
+        assert header == ["worker", "thread", "i", "check"]
+    else:
+        rows = [tuple(str(value) for value in row) for row in read_sqlite_rows(path)]
+    assert sorted(map(tuple, rows)) == expected_rows([0])
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="necesită fork")
+@pytest.mark.parametrize("suffix", [".csv", ".db"])
+def test_processes_write_every_row_once(tmp_path, suffix):
+    path = str(tmp_path / f"log{suffix}")
+    context = multiprocessing.get_context("fork")
+    # un rând în bufferul părintelui la fork nu trebuie scris și de copii
+    parent = get_prediction_logger(path, batch_size=1000, flush_interval=0)
+    parent.log({"worker": -1, "thread": 0, "i": 0, "check": "-1-0-0"})
+    processes = [context.Process(target=process_worker, args=(path, w)) for w in range(WORKERS)]
+    for p in processes:
+        p.start()
+    for p in processes:
+        p.join()
+        assert p.exitcode == 0
+    parent.close()
+
+    if suffix == ".csv":
+        header, *rows = read_csv_rows(path)
+        assert header == ["worker", "thread", "i", "check"]
+    else:
+        rows = [tuple(str(value) for value in row) for row in read_sqlite_rows(path)]
+    assert sorted(map(tuple, rows)) == sorted(expected_rows(range(WORKERS)) + [("-1", "0", "0", "-1-0-0")])
+
+
+def test_existing_csv_header_keeps_columns_aligned(tmp_path, capsys):
+    path = tmp_path / "log.csv"
+    path.write_text("check,i,worker\nold,0,0\n", encoding="utf-8")
+
+    logger = PredictionLogger(str(path), batch_size=2, flush_interval=0)
+    logger.log({"worker": 1, "i": 5, "check": "a", "extra": "x"})
+    logger.log({"i": 6, "worker": 2, "check": "b"})
+    logger.close()
+
+    assert read_csv_rows(path) == [["check", "i", "worker"], ["old", "0", "0"], ["a", "5", "1"], ["b", "6", "2"]]
+    assert "extra" in capsys.readouterr().out
+
+
+def test_sqlite_adds_new_columns(tmp_path):
+    path = str(tmp_path / "log.db")
+    logger = PredictionLogger(path, sink="sqlite", batch_size=1, flush_interval=0)
+    logger.log({"worker": 1, "i": 1})
+    logger.log({"worker": 2, "i": 2, "extra": "x"})
+    logger.close()
+
+    connection = sqlite3.connect(path)
+    try:
+        rows = connection.execute("SELECT worker, i, extra, Logged_At IS NOT NULL FROM predictions").fetchall()
+    finally:
+        connection.close()
+    assert rows == [(1, 1, None, 1), (2, 2, "x", 1)]
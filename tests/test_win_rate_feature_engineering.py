@@ -0,0 +1,47 @@
+import os
+
+import pandas as pd
+import pytest
+
+from win_rate_feature_engineering import FootballWinRateFeatures
+
+LEAGUES = ["romania-superliga-2024-2025", "premier-league-2025-2026"]
+
+
+def clean_csv(processed_dir, league):
+    return os.path.join(processed_dir, f"standings-with-matches-{league}-clean.csv")
+
+
+@pytest.mark.parametrize("league", LEAGUES)
+def test_loop_and_vectorized_engines_match(processed_dir, league):
+    csv_path = clean_csv(processed_dir, league)
+    loop = FootballWinRateFeatures(csv_path).encode_columns() \
+        .create_winrate_features(N_recent=5, engine="loop")
+    vectorized = FootballWinRateFeatures(csv_path).encode_columns() \
+        .create_winrate_features(N_recent=5, engine="vectorized")
+
+    assert loop.df.to_csv(index=False) == vectorized.df.to_csv(index=False)
+
+
+@pytest.mark.parametrize("league", LEAGUES)
+def test_append_matches_full_recompute(processed_dir, league, tmp_path, capsys):
+    csv_path = clean_csv(processed_dir, league)
+    df = pd.read_csv(csv_path)
+    dates = pd.to_datetime(df["Date"], format="%d.%m.%Y")
+    last_dates = dates.drop_duplicates().nlargest(3)
+    truncated_csv = tmp_path / "truncated.csv"
+    df[~dates.isin(last_dates)].to_csv(truncated_csv, index=False)
+
+    # sezonul fără ultimele 3 zile de meciuri, salvat împreună cu starea
+    appended_csv = tmp_path / "appended.csv"
+    FootballWinRateFeatures(str(truncated_csv)).encode_columns() \
+        .create_winrate_features(N_recent=5).save_csv(str(appended_csv))
+    FootballWinRateFeatures(csv_path).encode_columns() \
+        .append_winrate_features(str(appended_csv), N_recent=5).save_csv(str(appended_csv))
+    assert "incremental" in capsys.readouterr().out
+
+    full_csv = tmp_path / "full.csv"
+    FootballWinRateFeatures(csv_path).encode_columns() \
+        .create_winrate_features(N_recent=5).save_csv(str(full_csv))
+
+    assert appended_csv.read_bytes() == full_csv.read_bytes()
@@ -1,10 +1,22 @@
+import json
+import os
+
+import numpy as np
 import pandas as pd
 from sklearn.preprocessing import LabelEncoder
 
 class FootballWinRateFeatures:
+    FORM_WEIGHTS = [0.3, 0.2, 0.1]
+    FEATURE_COLUMNS = ['win_rate_global', 'win_rate_lastN', 'home_win_rate', 'away_win_rate',
+                       'h2h_win_rate', 'win_streak', 'form_score', 'goal_diff',
+                       'goal_diff_win_rate', 'weighted_outcome']
+    # un rând din CSV-ul anterior e refolosit doar dacă meciul și rezultatul lui sunt neschimbate
+    MATCH_KEY = ['Team', 'Opponent', 'Date', 'Time', 'Home/Away', 'Outcome', 'team_goals', 'opponent_goals']
+
     def __init__(self, csv_path: str):
         self.df = pd.read_csv(csv_path)
         self.team_encoder = LabelEncoder()
+        self.state = None
         if "Goals For" in self.df.columns:
             self.df.rename(columns={"Goals For": "team_goals", "Goals Against": "opponent_goals"}, inplace=True)
 
@@ -20,9 +32,106 @@ class FootballWinRateFeatures:
         self.df["Target_encoded"] = self.df["Target_Winner"].map({"team": 1, "opponent": 2, "draw": 0})
         return self
 
-    def create_winrate_features(self, N_recent: int = 3):
-        df = self.df.copy()
-        df = df.sort_values(["Team", "Date", "Time"]).reset_index(drop=True)
+    @staticmethod
+    def state_path(output_path: str) -> str:
+        return os.path.splitext(output_path)[0] + ".state.json"
+
+    @staticmethod
+    def _sort_matches(df: pd.DataFrame) -> pd.DataFrame:
+        # sortare cronologică: Date e în format zz.ll.aaaa, deci nu poate fi sortată ca text
+        match_date = pd.to_datetime(df["Date"], format="%d.%m.%Y", errors="coerce")
+        order = (df.assign(_match_date=match_date)
+                 .sort_values(["Team", "_match_date", "Time"]).index)
+        return df.loc[order].reset_index(drop=True)
+
+    def create_winrate_features(self, N_recent: int = 3, engine: str = "vectorized"):
+        """
+        Calculează feature-urile de win rate per echipă. engine="vectorized" folosește sume
+        cumulative pe grupuri; engine="loop" păstrează implementarea rând cu rând ca referință.
+        """
+        df = self._sort_matches(self.df.copy())
+
+        if engine == "vectorized":
+            df = self._winrate_features_vectorized(df, N_recent)
+        elif engine == "loop":
+            df = self._winrate_features_loop(df, N_recent)
+        else:
+            raise ValueError(f"Engine necunoscut: {engine}")
+
+        fill_neutral = ['win_rate_global','win_rate_lastN','home_win_rate','away_win_rate',
+                        'h2h_win_rate','form_score','goal_diff_win_rate','weighted_outcome']
+        df[fill_neutral] = df[fill_neutral].fillna(0.5)
+
+        self.df = df
+        self.state = self._build_state(df, N_recent)
+        return self
+
+    def _winrate_features_vectorized(self, df: pd.DataFrame, N_recent: int) -> pd.DataFrame:
+        n_rows = len(df)
+        row_pos = np.arange(n_rows)
+        win = (df['Outcome'] == 'W').to_numpy(dtype=np.int64)
+        is_home = (df['Home/Away'] == 'home').to_numpy(dtype=np.int64)
+        is_away = (df['Home/Away'] == 'away').to_numpy(dtype=np.int64)
+        goal_diff = df['team_goals'] - df['opponent_goals']
+        gd_win = (goal_diff > 0).to_numpy(dtype=np.int64)
+
+        # df e sortat pe Team, deci meciurile fiecărei echipe sunt contigue
+        team = df['Team'].to_numpy()
+        group_start = np.r_[True, team[1:] != team[:-1]] if n_rows else np.zeros(0, dtype=bool)
+        start_pos = np.maximum.accumulate(np.where(group_start, row_pos, 0)) if n_rows else row_pos
+        pos = row_pos - start_pos
+        games_played = pos + 1
+        window_len = np.minimum(games_played, N_recent)
+
+        def grouped_cumsum(values):
+            cs = np.cumsum(values)
+            return cs - (cs - values)[start_pos]
+
+        def lagged(values, k):
+            out = np.zeros_like(values)
+            out[k:] = values[:max(n_rows - k, 0)]
+            out[pos < k] = 0
+            return out
+
+        def grouped_window_sum(values):
+            cs = grouped_cumsum(values)
+            return cs - lagged(cs, N_recent)
+
+        df['win_rate_global'] = grouped_cumsum(win) / games_played
+        df['win_rate_lastN'] = grouped_window_sum(win) / window_len
+
+        home_games = grouped_cumsum(is_home)
+        away_games = grouped_cumsum(is_away)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            df['home_win_rate'] = np.where(home_games > 0, grouped_cumsum(win * is_home) / home_games, 0.5)
+            df['away_win_rate'] = np.where(away_games > 0, grouped_cumsum(win * is_away) / away_games, 0.5)
+
+        # h2h: doar meciurile anterioare cu același adversar
+        h2h_group = pd.Series(win, index=df.index).groupby([df['Team'], df['Opponent']], sort=False)
+        h2h_games = h2h_group.cumcount().to_numpy(dtype=float)
+        h2h_wins = (h2h_group.cumsum() - win).to_numpy(dtype=float)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            df['h2h_win_rate'] = np.where(h2h_games > 0, h2h_wins / h2h_games, 0.5)
+
+        last_loss = np.maximum.accumulate(np.where(win == 0, row_pos, -1)) if n_rows else row_pos
+        df['win_streak'] = row_pos - np.maximum(last_loss, start_pos - 1)
+
+        # fereastra incompletă folosește ultimele ponderi, ca în implementarea de referință
+        weights = self.FORM_WEIGHTS
+        w0, w1, w2 = win, lagged(win, 1), lagged(win, 2)
+        df['form_score'] = np.select(
+            [pos >= 2, pos == 1],
+            [w0 * weights[0] + w1 * weights[1] + w2 * weights[2], w0 * weights[1] + w1 * weights[2]],
+            w0 * weights[2])
+
+        df['goal_diff'] = goal_diff
+        df['goal_diff_win_rate'] = grouped_window_sum(gd_win) / window_len
+        df['weighted_outcome'] = (0.5 * df['win_rate_lastN'] +
+                                  0.3 * df['form_score'] +
+                                  0.2 * df['goal_diff_win_rate'])
+        return df
+
+    def _winrate_features_loop(self, df: pd.DataFrame, N_recent: int) -> pd.DataFrame:
 
         df['win_rate_global'] = 0.0
         df['win_rate_lastN'] = 0.0
@@ -35,7 +144,7 @@ class FootballWinRateFeatures:
         df['goal_diff_win_rate'] = 0.0
         df['weighted_outcome'] = 0.0
 
-        weights = [0.3,0.2,0.1]
+        weights = self.FORM_WEIGHTS
 
         for team in df['Team'].unique():
             team_mask = df['Team'] == team
@@ -78,14 +187,145 @@ class FootballWinRateFeatures:
                                                  0.3*df.at[idx,'form_score'] +
                                                  0.2*df.at[idx,'goal_diff_win_rate'])
 
-        fill_neutral = ['win_rate_global','win_rate_lastN','home_win_rate','away_win_rate',
-                        'h2h_win_rate','form_score','goal_diff_win_rate','weighted_outcome']
-        df[fill_neutral] = df[fill_neutral].fillna(0.5)
+        return df
+
+    def _build_state(self, df: pd.DataFrame, N_recent: int) -> dict:
+        """Starea cumulată per echipă după ultimul meci din df, folosită de append_winrate_features."""
+        window = max(N_recent, len(self.FORM_WEIGHTS))
+        tracked = pd.DataFrame({
+            'Team': df['Team'],
+            'Opponent': df['Opponent'],
+            'win': (df['Outcome'] == 'W').astype(int),
+            'home': (df['Home/Away'] == 'home').astype(int),
+            'away': (df['Home/Away'] == 'away').astype(int),
+            'gd_win': ((df['team_goals'] - df['opponent_goals']) > 0).astype(int)})
+        tracked['home_win'] = tracked['win'] * tracked['home']
+        tracked['away_win'] = tracked['win'] * tracked['away']
+
+        totals = tracked.groupby('Team', sort=False)[['win', 'home', 'home_win', 'away', 'away_win']].sum()
+        h2h = tracked.groupby(['Team', 'Opponent'], sort=False)['win'].agg(['size', 'sum'])
+
+        teams = {}
+        for team, team_df in tracked.groupby('Team', sort=False):
+            teams[team] = {
+                'games': len(team_df),
+                'wins': int(totals.at[team, 'win']),
+                'home_games': int(totals.at[team, 'home']),
+                'home_wins': int(totals.at[team, 'home_win']),
+                'away_games': int(totals.at[team, 'away']),
+                'away_wins': int(totals.at[team, 'away_win']),
+                'streak': int(df.at[team_df.index[-1], 'win_streak']),
+                'recent_wins': team_df['win'].tail(window).tolist(),
+                'recent_gd_wins': team_df['gd_win'].tail(N_recent).tolist(),
+                'h2h': {}}
+        for (team, opponent), (games, wins) in h2h.iterrows():
+            teams[team]['h2h'][opponent] = [int(games), int(wins)]
+
+        return {'N_recent': N_recent, 'teams': teams}
+
+    def _features_from_state(self, row: pd.Series, team_state: dict, N_recent: int) -> dict:
+        """Avansează starea echipei cu un meci nou și întoarce feature-urile pentru acel rând."""
+        win = 1 if row['Outcome'] == 'W' else 0
+        goal_diff = row['team_goals'] - row['opponent_goals']
+        h2h_games, h2h_wins = team_state['h2h'].get(row['Opponent'], [0, 0])
+
+        team_state['games'] += 1
+        team_state['wins'] += win
+        if row['Home/Away'] == 'home':
+            team_state['home_games'] += 1
+            team_state['home_wins'] += win
+        elif row['Home/Away'] == 'away':
+            team_state['away_games'] += 1
+            team_state['away_wins'] += win
+        team_state['h2h'][row['Opponent']] = [h2h_games + 1, h2h_wins + win]
+        team_state['streak'] = team_state['streak'] + 1 if win else 0
+
+        window = max(N_recent, len(self.FORM_WEIGHTS))
+        team_state['recent_wins'] = (team_state['recent_wins'] + [win])[-window:]
+        team_state['recent_gd_wins'] = (team_state['recent_gd_wins'] + [1 if goal_diff > 0 else 0])[-N_recent:]
+
+        recent = team_state['recent_wins'][-N_recent:]
+        form_window = team_state['recent_wins'][-len(self.FORM_WEIGHTS):]
+        features = {
+            'win_rate_global': team_state['wins'] / team_state['games'],
+            'win_rate_lastN': sum(recent) / len(recent),
+            'home_win_rate': (team_state['home_wins'] / team_state['home_games']
+                              if team_state['home_games'] > 0 else 0.5),
+            'away_win_rate': (team_state['away_wins'] / team_state['away_games']
+                              if team_state['away_games'] > 0 else 0.5),
+            'h2h_win_rate': h2h_wins / h2h_games if h2h_games > 0 else 0.5,
+            'win_streak': team_state['streak'],
+            'form_score': sum(f * w for f, w in zip(form_window[::-1], self.FORM_WEIGHTS[-len(form_window):])),
+            'goal_diff': goal_diff,
+            'goal_diff_win_rate': sum(team_state['recent_gd_wins']) / len(team_state['recent_gd_wins'])}
+        features['weighted_outcome'] = (0.5 * features['win_rate_lastN'] +
+                                        0.3 * features['form_score'] +
+                                        0.2 * features['goal_diff_win_rate'])
+        return features
+
+    def append_winrate_features(self, previous_csv: str, N_recent: int = 3):
+        """
+        Mod incremental: refolosește feature-urile din previous_csv și calculează doar rândurile noi
+        pornind de la starea salvată lângă el. Dacă meciurile noi nu vin după ultimul meci al
+        echipei (sau starea lipsește), se face un recalcul complet.
+        """
+        state_file = self.state_path(previous_csv)
+        if not os.path.exists(previous_csv) or not os.path.exists(state_file):
+            print("Nu există stare salvată, recalculăm toate feature-urile")
+            return self.create_winrate_features(N_recent=N_recent)
+
+        with open(state_file, "r", encoding="utf-8") as f:
+            state = json.load(f)
+
+        df = self._sort_matches(self.df.copy())
+        previous = pd.read_csv(previous_csv, usecols=self.MATCH_KEY + self.FEATURE_COLUMNS,
+                               float_precision='round_trip')
+        merged = df[self.MATCH_KEY].merge(previous, on=self.MATCH_KEY, how='left', indicator=True)
+        is_new = (merged['_merge'] == 'left_only').to_numpy()
+
+        if (state.get('N_recent') != N_recent or len(merged) != len(df)
+                or (~is_new).sum() != len(previous)):
+            print("Starea salvată nu corespunde datelor, recalculăm toate feature-urile")
+            return self.create_winrate_features(N_recent=N_recent)
+
+        # meciurile vechi ale fiecărei echipe trebuie să fie înaintea celor noi, altfel starea e invalidă
+        row_pos = pd.Series(np.arange(len(df)), index=df.index)
+        last_old = row_pos[~is_new].groupby(df.loc[~is_new, 'Team']).max()
+        first_new = row_pos[is_new].groupby(df.loc[is_new, 'Team']).min()
+        new_dates = pd.to_datetime(df.loc[is_new, 'Date'], format="%d.%m.%Y", errors="coerce")
+        if (first_new < last_old.reindex(first_new.index, fill_value=-1)).any() or new_dates.isna().any():
+            print("Meciuri noi înaintea celor existente, recalculăm toate feature-urile")
+            return self.create_winrate_features(N_recent=N_recent)
+
+        for column in self.FEATURE_COLUMNS:
+            df[column] = merged[column].to_numpy()
+
+        empty_state = {'games': 0, 'wins': 0, 'home_games': 0, 'home_wins': 0, 'away_games': 0,
+                       'away_wins': 0, 'streak': 0, 'recent_wins': [], 'recent_gd_wins': [], 'h2h': {}}
+        teams_state = state['teams']
+        for idx, row in df[is_new].iterrows():
+            team_state = teams_state.setdefault(row['Team'], json.loads(json.dumps(empty_state)))
+            for column, value in self._features_from_state(row, team_state, N_recent).items():
+                df.at[idx, column] = value
+
+        df['win_streak'] = df['win_streak'].astype('int64')
+        df['goal_diff'] = df['team_goals'] - df['opponent_goals']
+        print(f"Feature-uri calculate incremental pentru {int(is_new.sum())} rânduri noi")
 
         self.df = df
+        self.state = state
+        return self
+
+    def save_state(self, state_file: str):
+        if self.state is None:
+            raise ValueError("Nu există stare. Apelează create_winrate_features() mai întâi.")
+        with open(state_file, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, ensure_ascii=False)
         return self
 
     def save_csv(self, output_path: str):
         self.df.to_csv(output_path, index=False, encoding='utf-8')
         print(f"CSV cu win rate features salvat: {output_path}")
+        if self.state is not None:
+            self.save_state(self.state_path(output_path))
         return self